@@ -0,0 +1,53 @@
+import gzip
+import json
+import timeit
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+
+from main import BrandResult
+
+# A realistic /api/generate payload: 30 names, long brand story, full strategy
+result = {
+    "names": [f"Brandname{i}" for i in range(30)],
+    "taglines": ["Brewed for tomorrow.", "Every cup counts.", "Good coffee, better planet."],
+    "description": "A sustainable coffee roaster for young adults. " * 3,
+    "colors": [{"hex": "#2F4F4F", "name": "Dark Slate Gray"}, {"hex": "#DEB887", "name": "Burlywood"}, {"hex": "#F5F5DC", "name": "Beige"}],
+    "voiceTraits": ["Friendly"],
+    "socialPost": "Meet your new favourite morning ritual ☕🌱 #Launch",
+    "bio": "We roast ethically sourced beans in small batches.",
+    "brandStory": "It started with a single bag of beans and a question about where they came from. " * 20,
+    "strategy": "Strategic positioning focuses on Coffee. We recommend emphasizing fair trade, sustainable, community.",
+    "keywords": ["fair trade", "coffee", "sustainable", "community", "millennials"],
+    "logoUrl": "http://localhost:8000/api/images/061f876c77dd3577aa687b8d9225c10c",
+    "moodboardUrl": "http://localhost:8000/api/images/aa0e491c32a59db3ed90e698b15a1bdc",
+    "sentiment": "Positive & Uplifting",
+    "confidence": 0.96,
+}
+brief = {"industry": "Coffee", "audience": "Millennials", "values": "Sustainability", "keywords": "Eco", "tone": "Friendly"}
+
+
+def before():
+    # json.dumps for the DB row, then response_model validation + stdlib encoding for the response
+    json.dumps(brief)
+    json.dumps(result)
+    validated = BrandResult(**result)
+    json.dumps(jsonable_encoder(validated), ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def after():
+    orjson.dumps(brief)
+    payload = orjson.dumps(result)
+    payload.decode()
+
+
+if __name__ == "__main__":
+    runs = 20000
+    old = timeit.timeit(before, number=runs) / runs * 1e6
+    new = timeit.timeit(after, number=runs) / runs * 1e6
+    print(f"stdlib + response_model: {old:.1f} us/request")
+    print(f"orjson, single pass:     {new:.1f} us/request")
+    print(f"CPU saved:               {old - new:.1f} us/request ({old / new:.1f}x)")
+
+    payload = orjson.dumps(result)
+    print(f"Payload: {len(payload)} bytes, gzip: {len(gzip.compress(payload))} bytes")
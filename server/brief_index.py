@@ -0,0 +1,207 @@
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+
+import numpy as np
+
+# Feature-hashing dimensions and LSH layout (16 tables x 8 bits keeps recall high above ~0.85 cosine)
+DIM = 4096
+LSH_TABLES = 16
+LSH_BITS = 8
+BRUTE_FORCE_LIMIT = 2048
+
+# Creative provenance values (projects.creative_source) that came from a real LLM generation
+REUSABLE_SOURCES = ("groq", "mistral")
+
+FIELD_WEIGHTS = {
+    "industry": 1.5,
+    "audience": 1.0,
+    "values": 1.0,
+    "keywords": 1.0,
+}
+
+STOPWORDS = {
+    "a", "an", "and", "the", "for", "of", "to", "in", "on", "with", "by",
+    "brand", "brands", "company", "business", "who", "that", "are", "is",
+}
+
+# Small bundled synonym map so common rewordings land on the same features
+SYNONYMS = {
+    "eco": "sustainable",
+    "ecofriendly": "sustainable",
+    "green": "sustainable",
+    "sustainability": "sustainable",
+    "environmental": "sustainable",
+    "millennials": "young",
+    "millennial": "young",
+    "genz": "young",
+    "youth": "young",
+    "students": "young",
+    "adults": "adult",
+    "tech": "technology",
+    "software": "technology",
+    "saas": "technology",
+    "cafe": "coffee",
+    "espresso": "coffee",
+    "luxury": "premium",
+    "highend": "premium",
+    "cheap": "affordable",
+    "budget": "affordable",
+    "fun": "playful",
+    "friendly": "warm",
+    "pro": "professional",
+    "corporate": "professional",
+    "innovative": "innovation",
+    "creative": "creativity",
+}
+
+
+def tokenize(text):
+    text = (text or "").lower().replace("-", "")
+    tokens = []
+    for word in re.findall(r"[a-z0-9]+", text):
+        word = SYNONYMS.get(word, word)
+        if word not in STOPWORDS:
+            tokens.append(word)
+    return tokens
+
+
+def _hash(feature):
+    digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+    value = int.from_bytes(digest, "little")
+    return value % DIM, (1.0 if value >> 63 else -1.0)
+
+
+def tone_key(brief):
+    """Canonical tone ("Warm & friendly" == "friendly, warm"); only briefs with the same tone can share copy."""
+    return " ".join(sorted(set(tokenize(brief.get("tone", "")))))
+
+
+def embed(brief):
+    """Hashing vectorizer over the BrandInput content fields (unigrams + char trigrams), L2-normalized.
+
+    Tone is left out: it is matched exactly by tone_key() instead of contributing similarity.
+    """
+    vector = np.zeros(DIM, dtype=np.float32)
+    for field, weight in FIELD_WEIGHTS.items():
+        for token in tokenize(brief.get(field, "")):
+            index, sign = _hash(f"{field}:{token}")
+            vector[index] += sign * weight
+            # Trigrams let "sustainable" and "sustainably" share most of their mass
+            padded = f"<{token}>"
+            for i in range(len(padded) - 2):
+                index, sign = _hash(f"{field}#{padded[i:i + 3]}")
+                vector[index] += sign * weight * 0.3
+
+    norm = np.linalg.norm(vector)
+    if norm > 0:
+        vector /= norm
+    return vector
+
+
+class BriefIndex:
+    """Approximate nearest-neighbour index of past briefs, fed incrementally from the projects table."""
+
+    def __init__(self, threshold=0.9):
+        self.threshold = threshold
+        self.ids = []
+        self.tones = {}  # tone_key -> positions of briefs written in that tone
+        # Briefs hash to ~100 non-zero features, so rows are kept in CSR form rather than dense DIM floats
+        self.indptr = [0]
+        self.indices = np.zeros(4096, dtype=np.int32)
+        self.values = np.zeros(4096, dtype=np.float32)
+        self.last_id = 0
+        self._lock = threading.Lock()
+
+        rng = np.random.default_rng(1337)
+        self._planes = rng.standard_normal((LSH_TABLES, LSH_BITS, DIM)).astype(np.float32)
+        self._bit_weights = 1 << np.arange(LSH_BITS)
+        self._buckets = [{} for _ in range(LSH_TABLES)]
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _signatures(self, vector):
+        bits = (self._planes @ vector) > 0
+        return (bits * self._bit_weights).sum(axis=1)
+
+    def _add(self, project_id, vector, tone=""):
+        nonzero = np.flatnonzero(vector)
+        if len(nonzero) == 0:
+            return  # an empty brief cannot match anything
+        start, end = self.indptr[-1], self.indptr[-1] + len(nonzero)
+        if end > len(self.indices):
+            capacity = max(end, len(self.indices) * 2)
+            self.indices = np.resize(self.indices, capacity)
+            self.values = np.resize(self.values, capacity)
+        self.indices[start:end] = nonzero
+        self.values[start:end] = vector[nonzero]
+        self.indptr.append(end)
+
+        position = len(self.ids)
+        self.ids.append(project_id)
+        self.tones.setdefault(tone, []).append(position)
+        for table, signature in enumerate(self._signatures(vector)):
+            self._buckets[table].setdefault(int(signature), []).append(position)
+
+    def _scores(self, rows, query):
+        # Sparse row . dense query for each candidate row, in one gather + segmented sum
+        indptr = np.asarray(self.indptr)
+        starts, lengths = indptr[rows], indptr[rows + 1] - indptr[rows]
+        offsets = np.cumsum(lengths) - lengths
+        positions = np.repeat(starts - offsets, lengths) + np.arange(lengths.sum())
+        products = query[self.indices[positions]] * self.values[positions]
+        return np.add.reduceat(products, offsets)
+
+    def sync(self, db_path):
+        # Only rows inserted since the last sync are embedded, so this is cheap to call per request.
+        # Projects whose creative came from a template or error fallback are never reuse candidates.
+        conn = sqlite3.connect(db_path)
+        try:
+            rows = conn.execute(
+                "SELECT id, input FROM projects WHERE id > ? AND creative_source IN ({}) ORDER BY id".format(
+                    ",".join("?" * len(REUSABLE_SOURCES))),
+                (self.last_id, *REUSABLE_SOURCES)
+            ).fetchall()
+        finally:
+            conn.close()
+
+        with self._lock:
+            for project_id, raw_input in rows:
+                if project_id <= self.last_id:
+                    continue
+                try:
+                    brief = json.loads(raw_input)
+                    self._add(project_id, embed(brief), tone_key(brief))
+                except (TypeError, ValueError) as e:
+                    print(f"Skipping unindexable project {project_id}: {e}")
+                self.last_id = project_id
+        return len(rows)
+
+    def nearest(self, brief):
+        """Returns (project_id, similarity) of the closest past brief in the same tone above the threshold, or None."""
+        query = embed(brief)
+        with self._lock:
+            same_tone = self.tones.get(tone_key(brief))
+            if not same_tone:
+                return None
+
+            if len(same_tone) <= BRUTE_FORCE_LIMIT:
+                candidates = np.array(same_tone, dtype=np.int64)
+            else:
+                found = set()
+                for table, signature in enumerate(self._signatures(query)):
+                    found.update(self._buckets[table].get(int(signature), ()))
+                found.intersection_update(same_tone)
+                if not found:
+                    return None
+                candidates = np.fromiter(found, dtype=np.int64)
+
+            scores = self._scores(candidates, query)
+            best = int(np.argmax(scores))
+            score = float(scores[best])
+            if score < self.threshold:
+                return None
+            return self.ids[int(candidates[best])], score
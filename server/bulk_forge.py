@@ -0,0 +1,281 @@
+import asyncio
+import codecs
+import csv
+import json
+import os
+import sqlite3
+import time
+import uuid
+
+# Column aliases accepted in uploaded catalogs
+FIELD_ALIASES = {
+    "productName": ["productName", "product_name", "name", "title"],
+    "productDescription": ["productDescription", "product_description", "description", "details"],
+    "tone": ["tone"],
+    "platform": ["platform"],
+    "topic": ["topic"],
+    "details": ["details"],
+}
+
+
+def detect_encoding(path, chunk_size=1 << 20):
+    """UTF-8 when the whole file decodes as such, otherwise cp1252 (spreadsheet exports on Windows)."""
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    with open(path, "rb") as f:
+        try:
+            for chunk in iter(lambda: f.read(chunk_size), b""):
+                decoder.decode(chunk)
+            decoder.decode(b"", final=True)
+        except UnicodeDecodeError:
+            return "cp1252"
+    return "utf-8-sig"
+
+
+def iter_rows(path, fmt):
+    """Streams (row_number, record) pairs from a CSV or JSONL file without loading it into memory."""
+    with open(path, newline="", encoding=detect_encoding(path), errors="replace") as f:
+        if fmt == "csv":
+            for row_number, record in enumerate(csv.DictReader(f)):
+                yield row_number, record
+        else:
+            row_number = 0
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    record = {"_error": "Invalid JSON line"}
+                if not isinstance(record, dict):
+                    record = {"_error": "JSON line is not an object"}
+                yield row_number, record
+                row_number += 1
+
+
+def to_forge_fields(record):
+    fields = {}
+    for field, aliases in FIELD_ALIASES.items():
+        for alias in aliases:
+            value = record.get(alias)
+            if value not in (None, ""):
+                fields[field] = str(value)
+                break
+    return fields
+
+
+class BulkForgeRunner:
+    """Fans a product catalog out to Content Forge with bounded concurrency, checkpointing in SQLite."""
+
+    def __init__(self, db_path, upload_dir, forge_one, forge_packed, concurrency=4, pack_size=5, pack_max_chars=280):
+        self.db_path = db_path
+        self.upload_dir = upload_dir
+        self.forge_one = forge_one
+        self.forge_packed = forge_packed
+        self.concurrency = concurrency
+        self.pack_size = pack_size
+        self.pack_max_chars = pack_max_chars
+        os.makedirs(upload_dir, exist_ok=True)
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=10)
+
+    async def create_run(self, fmt, forge_type, tone, chunks):
+        run_id = uuid.uuid4().hex
+        input_path = os.path.join(self.upload_dir, f"{run_id}.{fmt}")
+
+        # Spool the upload to disk chunk by chunk; the file is also what makes runs resumable
+        with open(input_path, "wb") as f:
+            async for chunk in chunks:
+                f.write(chunk)
+
+        now = time.time()
+        conn = self._connect()
+        conn.execute(
+            "INSERT INTO forge_runs (id, format, type, tone, input_path, status, total, done, failed, checkpoint, created_at, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, 'queued', NULL, 0, 0, 0, ?, ?)",
+            (run_id, fmt, forge_type, tone, input_path, now, now)
+        )
+        conn.commit()
+        conn.close()
+        return run_id
+
+    def progress(self, run_id):
+        conn = self._connect()
+        row = conn.execute(
+            "SELECT id, format, type, status, total, done, failed, checkpoint, created_at, updated_at FROM forge_runs WHERE id = ?",
+            (run_id,)
+        ).fetchone()
+        conn.close()
+        if not row:
+            return None
+        return {
+            "id": row[0],
+            "format": row[1],
+            "type": row[2],
+            "status": row[3],
+            "total": row[4],
+            "done": row[5],
+            "failed": row[6],
+            "checkpoint": row[7],
+            "createdAt": row[8],
+            "updatedAt": row[9],
+        }
+
+    def iter_results(self, run_id):
+        conn = self._connect()
+        try:
+            cursor = conn.execute(
+                "SELECT row, status, input, result, error FROM forge_items WHERE run_id = ? ORDER BY row",
+                (run_id,)
+            )
+            for row, status, raw_input, raw_result, error in cursor:
+                yield json.dumps({
+                    "row": row,
+                    "status": status,
+                    "input": json.loads(raw_input),
+                    "result": json.loads(raw_result) if raw_result else None,
+                    "error": error,
+                }) + "\n"
+        finally:
+            conn.close()
+
+    def _set_status(self, run_id, status, total=None):
+        conn = self._connect()
+        conn.execute(
+            "UPDATE forge_runs SET status = ?, total = COALESCE(?, total), updated_at = ? WHERE id = ?",
+            (status, total, time.time(), run_id)
+        )
+        conn.commit()
+        conn.close()
+
+    def _record(self, run_id, items, results, checkpoint):
+        conn = self._connect()
+        for (row_number, fields), result in zip(items, results):
+            error = result.get("error") if isinstance(result, dict) else "Empty result"
+            status = "failed" if error else "done"
+            conn.execute(
+                "INSERT OR REPLACE INTO forge_items (run_id, row, status, input, result, error) VALUES (?, ?, ?, ?, ?, ?)",
+                (run_id, row_number, status, json.dumps(fields), None if error else json.dumps(result), error)
+            )
+        conn.execute(
+            "UPDATE forge_runs SET done = (SELECT COUNT(*) FROM forge_items WHERE run_id = ? AND status = 'done'), "
+            "failed = (SELECT COUNT(*) FROM forge_items WHERE run_id = ? AND status = 'failed'), "
+            "checkpoint = ?, updated_at = ? WHERE id = ?",
+            (run_id, run_id, checkpoint, time.time(), run_id)
+        )
+        conn.commit()
+        conn.close()
+
+    def _process_batch(self, items, make_input):
+        if len(items) == 1 and "_error" in items[0][1]:
+            return [{"error": items[0][1]["_error"]}]
+
+        inputs = [make_input(fields) for _, fields in items]
+        if len(inputs) == 1:
+            return [self.forge_one(inputs[0])]
+
+        results = self.forge_packed(inputs)
+        # Products the packed call dropped are retried individually
+        return [r if r is not None else self.forge_one(inputs[i]) for i, r in enumerate(results)]
+
+    async def run(self, run_id, make_input):
+        try:
+            return await self._run(run_id, make_input)
+        except Exception:
+            # Leave a terminal status behind so pollers stop waiting; /resume can pick it up again
+            self._set_status(run_id, "failed")
+            raise
+
+    async def _run(self, run_id, make_input):
+        conn = self._connect()
+        row = conn.execute(
+            "SELECT format, type, tone, input_path, checkpoint FROM forge_runs WHERE id = ?", (run_id,)
+        ).fetchone()
+        if not row:
+            conn.close()
+            raise ValueError(f"Unknown bulk run {run_id}")
+        fmt, forge_type, tone, input_path, checkpoint = row
+        # Rows past the checkpoint that already succeeded are skipped on resume, and failed
+        # rows anywhere (e.g. still rate limited after retries) are run again
+        completed = {r[0] for r in conn.execute(
+            "SELECT row FROM forge_items WHERE run_id = ? AND row >= ? AND status = 'done'", (run_id, checkpoint)
+        )}
+        failed = {r[0] for r in conn.execute(
+            "SELECT row FROM forge_items WHERE run_id = ? AND status = 'failed'", (run_id,)
+        )}
+        conn.close()
+
+        self._set_status(run_id, "running")
+        print(f"Bulk forge {run_id}: resuming from row {checkpoint}" if checkpoint else f"Bulk forge {run_id}: starting")
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        pending = set()
+        outstanding = {}  # batch start row -> rows, to advance the contiguous checkpoint
+        frontier = {"row": checkpoint}  # first row not yet handed to a batch
+        total = 0
+
+        def build(fields):
+            fields = dict(fields)
+            fields.setdefault("tone", tone)
+            return make_input(forge_type, fields)
+
+        async def process(items):
+            async with semaphore:
+                results = await asyncio.to_thread(self._process_batch, items, build)
+            del outstanding[items[0][0]]
+            next_checkpoint = min(outstanding) if outstanding else frontier["row"]
+            self._record(run_id, items, results, max(checkpoint, next_checkpoint))
+
+        async def dispatch(items):
+            outstanding[items[0][0]] = items
+            pending.add(asyncio.create_task(process(items)))
+            # Keep the number of in-memory batches bounded regardless of catalog size
+            if len(pending) >= self.concurrency * 2:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                pending.difference_update(done)
+                for task in done:
+                    task.result()
+
+        batch = []
+        for row_number, record in iter_rows(input_path, fmt):
+            total = row_number + 1
+            if (row_number < checkpoint and row_number not in failed) or row_number in completed:
+                continue
+            fields = to_forge_fields(record)
+            if "_error" in record:
+                fields = {"_error": record["_error"]}
+
+            packable = (
+                forge_type == "description"
+                and self.pack_size > 1
+                and "_error" not in fields
+                and len(fields.get("productDescription", "")) <= self.pack_max_chars
+            )
+            if not packable:
+                frontier["row"] = batch[0][0] if batch else row_number + 1
+                await dispatch([(row_number, fields)])
+                continue
+            batch.append((row_number, fields))
+            frontier["row"] = batch[0][0]
+            if len(batch) >= self.pack_size:
+                frontier["row"] = row_number + 1
+                await dispatch(batch)
+                batch = []
+        if batch:
+            frontier["row"] = total
+            await dispatch(batch)
+
+        if pending:
+            for outcome in await asyncio.gather(*pending, return_exceptions=True):
+                if isinstance(outcome, Exception):
+                    raise outcome
+
+        self._set_status(run_id, "done", total=total)
+        conn = self._connect()
+        conn.execute("UPDATE forge_runs SET checkpoint = ? WHERE id = ?", (total, run_id))
+        conn.commit()
+        conn.close()
+        summary = self.progress(run_id)
+        print(f"Bulk forge {run_id}: {summary['done']} done, {summary['failed']} failed")
+        return summary
@@ -0,0 +1,163 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from urllib.parse import urlparse
+
+import requests
+
+
+class ImageCache:
+    """Fetches remote images once, keeps them on disk with LRU eviction, and coalesces concurrent fetches.
+
+    Only URLs registered server-side can be fetched, so the proxy endpoint cannot be
+    pointed at arbitrary hosts.
+    """
+
+    def __init__(self, db_path, cache_dir, public_base, max_bytes=512 * 1024 * 1024,
+                 allowed_hosts=("image.pollinations.ai",), fetch_workers=4, timeout=120):
+        self.db_path = db_path
+        self.cache_dir = cache_dir
+        self.public_base = public_base.rstrip("/")
+        self.max_bytes = max_bytes
+        self.allowed_hosts = set(allowed_hosts)
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=fetch_workers)
+        self._inflight = {}  # key -> Future, shared by prefetches and requests
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+        self._create_table()
+
+    def _create_table(self):
+        # Owned here rather than in the app's init_db so scripts can use the cache on its own
+        conn = self._connect()
+        try:
+            conn.execute('''CREATE TABLE IF NOT EXISTS image_assets
+                            (key TEXT PRIMARY KEY, url TEXT, path TEXT, size INTEGER, content_type TEXT,
+                             created_at REAL, last_access REAL)''')
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=10)
+
+    def proxy(self, url, prefetch=True):
+        """Registers a remote image and returns the local URL that serves it."""
+        if urlparse(url).hostname not in self.allowed_hosts:
+            return url
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()[:32]
+        conn = self._connect()
+        try:
+            conn.execute(
+                "INSERT OR IGNORE INTO image_assets (key, url, size, created_at, last_access) VALUES (?, ?, 0, ?, ?)",
+                (key, url, time.time(), time.time())
+            )
+            conn.commit()
+        finally:
+            conn.close()
+        if prefetch:
+            # Start the slow external render now so it is warm before the client asks
+            self.fetch_future(key)
+        return f"{self.public_base}/api/images/{key}"
+
+    def key_from_url(self, url):
+        prefix = f"{self.public_base}/api/images/"
+        return url[len(prefix):] if url and url.startswith(prefix) else None
+
+    def lookup(self, key):
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT url, path, content_type FROM image_assets WHERE key = ?", (key,)
+            ).fetchone()
+        finally:
+            conn.close()
+        return row
+
+    def fetch_future(self, key):
+        """Future resolving to (path, content_type); a single download per key however many callers."""
+        row = self.lookup(key)
+        if row is None:
+            raise KeyError(key)
+        url, path, content_type = row
+        if path and os.path.exists(path):
+            self._touch(key)
+            done = Future()
+            done.set_result((path, content_type))
+            return done
+
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is None:
+                future = self._executor.submit(self._download, key, url)
+                self._inflight[key] = future
+                future.add_done_callback(lambda f, k=key: self._forget(k, f))
+            return future
+
+    def fetch(self, key, timeout=None):
+        return self.fetch_future(key).result(timeout=timeout)
+
+    def _forget(self, key, future):
+        with self._lock:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    def _download(self, key, url):
+        print(f"Caching remote image {key}...")
+        response = requests.get(url, timeout=self.timeout)
+        response.raise_for_status()
+        content_type = response.headers.get("Content-Type", "image/jpeg").split(";")[0]
+
+        path = os.path.join(self.cache_dir, key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(response.content)
+        os.replace(tmp_path, path)
+
+        conn = self._connect()
+        try:
+            conn.execute(
+                "UPDATE image_assets SET path = ?, size = ?, content_type = ?, last_access = ? WHERE key = ?",
+                (path, len(response.content), content_type, time.time(), key)
+            )
+            conn.commit()
+        finally:
+            conn.close()
+        self.evict()
+        return path, content_type
+
+    def _touch(self, key):
+        conn = self._connect()
+        try:
+            conn.execute("UPDATE image_assets SET last_access = ? WHERE key = ?", (time.time(), key))
+            conn.commit()
+        finally:
+            conn.close()
+
+    def evict(self):
+        # Least recently served files go first; the row stays so the image can be re-fetched
+        conn = self._connect()
+        try:
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM image_assets WHERE path IS NOT NULL").fetchone()[0]
+            if total <= self.max_bytes:
+                return 0
+            evicted = 0
+            for key, path, size in conn.execute(
+                "SELECT key, path, size FROM image_assets WHERE path IS NOT NULL ORDER BY last_access"
+            ).fetchall():
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                conn.execute("UPDATE image_assets SET path = NULL, size = 0 WHERE key = ?", (key,))
+                total -= size
+                evicted += 1
+            conn.commit()
+            return evicted
+        finally:
+            conn.close()
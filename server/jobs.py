@@ -0,0 +1,230 @@
+import asyncio
+import inspect
+import json
+import sqlite3
+import time
+import uuid
+
+
+class JobQueue:
+    """SQLite-backed job queue drained by a bounded pool of asyncio workers.
+
+    Jobs survive restarts: anything still queued, or running with an expired lease
+    (e.g. the process died mid-job), is picked up again by the next worker.
+    """
+
+    def __init__(self, db_path, workers=2, max_attempts=3, backoff=2.0, lease_seconds=60):
+        self.db_path = db_path
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.lease_seconds = lease_seconds
+        self.handlers = {}
+        self._tasks = []
+        self._wake = None
+        self._stopping = False
+        self._finished = {}  # job_id -> [asyncio.Event, waiter count], for push notifications
+
+    def register(self, kind, handler):
+        self.handlers[kind] = handler
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=10)
+
+    def submit(self, kind, payload, dedupe_key=None):
+        conn = self._connect()
+        try:
+            # An identical job that is still pending is shared instead of enqueued twice
+            if dedupe_key:
+                row = conn.execute(
+                    "SELECT id FROM jobs WHERE kind = ? AND dedupe_key = ? AND status IN ('queued', 'running')",
+                    (kind, dedupe_key)
+                ).fetchone()
+                if row:
+                    return row[0]
+
+            job_id = uuid.uuid4().hex
+            now = time.time()
+            conn.execute(
+                "INSERT INTO jobs (id, kind, payload, dedupe_key, status, attempts, run_after, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, 'queued', 0, ?, ?, ?)",
+                (job_id, kind, json.dumps(payload), dedupe_key, now, now, now)
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
+        if self._wake:
+            self._wake.set()
+        return job_id
+
+    def get(self, job_id):
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT id, kind, status, attempts, result, error, created_at, updated_at FROM jobs WHERE id = ?",
+                (job_id,)
+            ).fetchone()
+        finally:
+            conn.close()
+        if not row:
+            return None
+        return {
+            "id": row[0],
+            "kind": row[1],
+            "status": row[2],
+            "attempts": row[3],
+            "result": json.loads(row[4]) if row[4] else None,
+            "error": row[5],
+            "createdAt": row[6],
+            "updatedAt": row[7],
+        }
+
+    async def wait(self, job_id, timeout):
+        """Waits until the job finishes in this process, or the timeout passes."""
+        entry = self._finished.setdefault(job_id, [asyncio.Event(), 0])
+        entry[1] += 1
+        try:
+            await asyncio.wait_for(entry[0].wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            entry[1] -= 1
+            # Jobs finished by another worker process never pop their entry, so the last waiter does
+            if entry[1] == 0 and self._finished.get(job_id) is entry:
+                del self._finished[job_id]
+
+    async def start(self):
+        self._stopping = False
+        self._wake = asyncio.Event()
+        for _ in range(self.workers):
+            self._tasks.append(asyncio.create_task(self._worker()))
+        print(f"Job queue started with {self.workers} workers")
+
+    async def stop(self):
+        # The flag covers a cancel lost to wait_for (it returns normally if the wake fires at the same moment)
+        self._stopping = True
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def _claim(self):
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT id, kind, payload, attempts FROM jobs "
+                "WHERE (status = 'queued' AND run_after <= ?) OR (status = 'running' AND lease_until < ?) "
+                "ORDER BY created_at LIMIT 1",
+                (now, now)
+            ).fetchone()
+            if row:
+                conn.execute(
+                    "UPDATE jobs SET status = 'running', attempts = attempts + 1, lease_until = ?, updated_at = ? WHERE id = ?",
+                    (now + self.lease_seconds, now, row[0])
+                )
+            conn.commit()
+        finally:
+            conn.close()
+        if not row:
+            return None
+        return {"id": row[0], "kind": row[1], "payload": json.loads(row[2]), "attempts": row[3] + 1}
+
+    def _release(self, job_id):
+        # Handed back on shutdown: not a failed attempt, and runnable again straight away
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute(
+                "UPDATE jobs SET status = 'queued', attempts = MAX(attempts - 1, 0), run_after = ?, "
+                "lease_until = NULL, updated_at = ? WHERE id = ? AND status = 'running'",
+                (now, now, job_id)
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _finish(self, job_id, status, result=None, error=None, run_after=None):
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, run_after = COALESCE(?, run_after), "
+                "lease_until = NULL, updated_at = ? WHERE id = ?",
+                (status, json.dumps(result) if result is not None else None, error, run_after, now, job_id)
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
+    async def _worker(self):
+        while not self._stopping:
+            # SQLite calls run in a thread: BEGIN IMMEDIATE can wait on other processes' writes
+            claim = asyncio.ensure_future(asyncio.to_thread(self._claim))
+            try:
+                job = await asyncio.shield(claim)
+            except asyncio.CancelledError:
+                # Stopped mid-claim: the claim still completes, so hand its job straight back
+                job = await claim
+                if job:
+                    self._release(job["id"])
+                raise
+            if job is None:
+                # Sleep until a submit wakes us, or poll for retries that became due
+                self._wake.clear()
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=1.0)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self._run(job)
+
+    def _renew_lease(self, job_id):
+        conn = self._connect()
+        try:
+            conn.execute(
+                "UPDATE jobs SET lease_until = ? WHERE id = ? AND status = 'running'",
+                (time.time() + self.lease_seconds, job_id)
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
+    async def _heartbeat(self, job_id):
+        # Long jobs (e.g. bulk runs) keep their lease so no other worker reclaims them
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            await asyncio.to_thread(self._renew_lease, job_id)
+
+    async def _run(self, job):
+        handler = self.handlers.get(job["kind"])
+        heartbeat = asyncio.create_task(self._heartbeat(job["id"]))
+        try:
+            if handler is None:
+                raise ValueError(f"No handler registered for job kind '{job['kind']}'")
+            if inspect.iscoroutinefunction(handler):
+                result = await handler(job["payload"])
+            else:
+                result = await asyncio.to_thread(handler, job["payload"])
+            await asyncio.to_thread(self._finish, job["id"], "done", result=result)
+            print(f"Job {job['id']} ({job['kind']}) done")
+        except asyncio.CancelledError:
+            # Shutdown: requeue now rather than leaving the job leased until the lease runs out
+            self._release(job["id"])
+            raise
+        except Exception as e:
+            if job["attempts"] < self.max_attempts:
+                delay = self.backoff ** job["attempts"]
+                print(f"Job {job['id']} failed (attempt {job['attempts']}), retrying in {delay:.0f}s: {e}")
+                await asyncio.to_thread(self._finish, job["id"], "queued", error=str(e), run_after=time.time() + delay)
+                return
+            print(f"Job {job['id']} failed permanently: {e}")
+            await asyncio.to_thread(self._finish, job["id"], "failed", error=str(e))
+        finally:
+            heartbeat.cancel()
+
+        entry = self._finished.pop(job["id"], None)
+        if entry:
+            entry[0].set()
@@ -0,0 +1,168 @@
+import json
+
+CLOSERS = {"{": "}", "[": "]"}
+
+
+class JSONObjectExtractor:
+    """Incrementally pulls the first top-level JSON object out of a token stream.
+
+    Anything before the opening brace (prose, a ```json fence) is skipped, and feed()
+    reports as soon as the object closes so the caller can stop generation there.
+    If the stream ends early, parse() repairs the truncated text before decoding.
+    """
+
+    def __init__(self):
+        self.chars = []
+        self.stack = []
+        self.element_starts = []  # per open container: where an array's current element begins
+        self.in_string = False
+        self.escape = False
+        self.started = False
+        self.complete = False
+
+    def feed(self, chunk):
+        """Consumes the next piece of generated text; returns True once the object is closed."""
+        for ch in chunk:
+            if self.complete:
+                break
+            if not self.started:
+                if ch != "{":
+                    continue
+                self.started = True
+
+            self.chars.append(ch)
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif ch == "\\":
+                    self.escape = True
+                elif ch == '"':
+                    self.in_string = False
+            elif ch == '"':
+                self.in_string = True
+            elif ch in CLOSERS:
+                self.stack.append(CLOSERS[ch])
+                self.element_starts.append(len(self.chars) if ch == "[" else None)
+            elif ch == "," and self.stack and self.stack[-1] == "]":
+                self.element_starts[-1] = len(self.chars)
+            elif ch in "}]" and self.stack:
+                self.stack.pop()
+                self.element_starts.pop()
+                self.complete = not self.stack
+        return self.complete
+
+    def text(self):
+        return "".join(self.chars)
+
+    def repair(self):
+        """Best-effort completion of a truncated object.
+
+        Closes open strings and containers, and drops what cannot be completed: dangling
+        keys, trailing commas, and a half-written array element (a partial color object
+        or tagline), so callers never see items with missing fields.
+        """
+        text, stack, in_string = self.text(), list(self.stack), self.in_string
+        for level, closer in enumerate(stack):
+            if closer != "]":
+                continue
+            start = self.element_starts[level]
+            if level < len(stack) - 1 or in_string or not _is_complete_value(text[start:]):
+                text, stack, in_string = text[:start], stack[:level + 1], False
+                break
+
+        if in_string:
+            if self.escape:
+                text = text[:-1]
+            text += '"'
+        text = _strip_trailing_commas(text).rstrip()
+
+        # A key with no value ("brandStory": or a bare "brandStory") cannot be completed
+        if stack and stack[-1] == "}":
+            if text.endswith(":"):
+                text = text[:-1].rstrip()
+                text = text[:_string_start(text)].rstrip()
+            elif text.endswith('"') and _expects_key(text[:_string_start(text)]):
+                text = text[:_string_start(text)].rstrip()
+        text = text.rstrip(", \n\t\r")
+        return text + "".join(reversed(stack))
+
+    def parse(self, required=(), defaults=None):
+        """Decodes the object (repairing it if needed) and checks it against the expected keys.
+
+        Raises ValueError when nothing usable was produced or a required key is missing.
+        """
+        if not self.started:
+            raise ValueError("No JSON object in generated text")
+        try:
+            data = json.loads(_strip_trailing_commas(self.text()))
+        except ValueError:
+            data = json.loads(self.repair())
+        if not isinstance(data, dict):
+            raise ValueError("Generated JSON is not an object")
+
+        missing = [key for key in required if not data.get(key)]
+        if missing:
+            raise ValueError(f"Generated JSON is missing keys: {', '.join(missing)}")
+        for key, value in (defaults or {}).items():
+            data.setdefault(key, value)
+        return data
+
+
+def extract_json(text, required=(), defaults=None):
+    """Non-streaming convenience: extracts and validates the first object in a finished generation."""
+    extractor = JSONObjectExtractor()
+    extractor.feed(text)
+    return extractor.parse(required, defaults)
+
+
+def _strip_trailing_commas(text):
+    # String-aware so commas inside values are left alone
+    out, in_string, escape = [], False, False
+    for ch in text:
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch in "}]":
+            while out and out[-1] in " \n\t\r":
+                out.pop()
+            if out and out[-1] == ",":
+                out.pop()
+        out.append(ch)
+    return "".join(out)
+
+
+def _is_complete_value(text):
+    text = text.strip()
+    if not text:
+        return True
+    try:
+        json.loads(text)
+    except ValueError:
+        return False
+    return True
+
+
+def _string_start(text):
+    """Index of the opening quote of the string literal that ends text."""
+    i = len(text) - 2
+    while i >= 0:
+        if text[i] == '"':
+            backslashes = 0
+            while i - 1 - backslashes >= 0 and text[i - 1 - backslashes] == "\\":
+                backslashes += 1
+            if backslashes % 2 == 0:
+                return i
+        i -= 1
+    return 0
+
+
+def _expects_key(prefix):
+    # Inside an object a string is a key when it follows "{" or ","
+    prefix = prefix.rstrip()
+    return prefix.endswith("{") or prefix.endswith(",")
@@ -1,9 +1,14 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import APIRouter, FastAPI, HTTPException, Request
+from fastapi.responses import StreamingResponse, FileResponse, RedirectResponse, Response, JSONResponse
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
 from typing import List, Optional
 import os
 import warnings
+import asyncio
+import inspect
+from contextlib import asynccontextmanager
 
 # Suppress critical warnings before importing libraries
 warnings.filterwarnings("ignore", category=FutureWarning)
@@ -17,12 +22,30 @@ from ibm_cloud_sdk_core.authenticators import IAMAuthenticator
 from ibm_watson.natural_language_understanding_v1 import Features, KeywordsOptions, CategoriesOptions
 import requests
 import json
+import orjson
 import sqlite3
 from huggingface_hub import InferenceClient
 import io
 import time
+import random
 import base64
 
+from singleflight import SingleFlight, normalize_input
+from brief_index import BriefIndex
+from jobs import JobQueue
+from bulk_forge import BulkForgeRunner
+from shared_state import SharedCache
+from name_engine import NameEngine
+from name_index import NameIndex
+from palette import extract_palette, has_brand_color, get_pool, shutdown_pool
+from text_analysis import TextAnalyzer
+from image_cache import ImageCache
+from json_stream import JSONObjectExtractor, extract_json
+
+try:
+    from brotli_asgi import BrotliMiddleware
+except ImportError:
+    BrotliMiddleware = None
 
 load_dotenv(os.path.join(os.path.dirname(__file__), '.env'), override=True)
 
@@ -34,34 +57,118 @@ print(f"HuggingFace Key: {'Found' if os.getenv('HUGGINGFACE_API_KEY') else 'Miss
 print(f"Stable Diffusion Key: {'Found' if os.getenv('STABLE_DIFFUSION_API_KEY') else 'Missing'}")
 print("---------------------")
 
-app = FastAPI()
-
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# Ensure static directory exists
-os.makedirs("static/generated_logos", exist_ok=True)
-app.mount("/static", StaticFiles(directory="static"), name="static")
-
-@app.get("/")
+class ORJSONResponse(JSONResponse):
+    # orjson is several times faster than the stdlib encoder for our larger payloads
+    def render(self, content):
+        return orjson.dumps(content)
+
+@asynccontextmanager
+async def lifespan(app):
+    # Runs once per worker process, after any fork, so nothing here is shared across workers
+    init_db()
+    init_services()
+    orchestrator.cache.purge()
+    name_index.load()
+    name_index.backfill_projects()
+    get_pool()
+    await job_queue.start()
+    yield
+    await job_queue.stop()
+    name_index.save()
+    shutdown_pool()
+
+router = APIRouter()
+
+COMPRESS_MIN_BYTES = int(os.getenv("COMPRESS_MIN_BYTES", 1024))
+
+@router.get("/")
 def home():
     return {"message": "Backend is running successfully!"}
 
 # Database Setup
 def init_db():
-    conn = sqlite3.connect('brand_forge.db')
+    conn = sqlite3.connect('brand_forge.db', timeout=30)
     c = conn.cursor()
+    # WAL lets several worker processes read while one writes
+    c.execute("PRAGMA journal_mode=WAL")
     c.execute('''CREATE TABLE IF NOT EXISTS projects
                  (id INTEGER PRIMARY KEY AUTOINCREMENT, input TEXT, result TEXT, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)''')
+    # Where a project's creative came from (groq, mistral, template); only LLM output is reused
+    if "creative_source" not in [col[1] for col in c.execute("PRAGMA table_info(projects)")]:
+        c.execute("ALTER TABLE projects ADD COLUMN creative_source TEXT")
+    c.execute('''CREATE TABLE IF NOT EXISTS jobs
+                 (id TEXT PRIMARY KEY, kind TEXT, payload TEXT, dedupe_key TEXT, status TEXT, attempts INTEGER DEFAULT 0,
+                  result TEXT, error TEXT, run_after REAL, lease_until REAL, created_at REAL, updated_at REAL)''')
+    c.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, run_after)")
+    c.execute('''CREATE TABLE IF NOT EXISTS forge_runs
+                 (id TEXT PRIMARY KEY, format TEXT, type TEXT, tone TEXT, input_path TEXT, status TEXT, total INTEGER,
+                  done INTEGER, failed INTEGER, checkpoint INTEGER, created_at REAL, updated_at REAL)''')
+    c.execute('''CREATE TABLE IF NOT EXISTS forge_items
+                 (run_id TEXT, row INTEGER, status TEXT, input TEXT, result TEXT, error TEXT, PRIMARY KEY (run_id, row))''')
+    c.execute('''CREATE TABLE IF NOT EXISTS shared_cache
+                 (key TEXT PRIMARY KEY, value TEXT, expires_at REAL)''')
+    c.execute('''CREATE TABLE IF NOT EXISTS name_index
+                 (id INTEGER PRIMARY KEY AUTOINCREMENT, norm TEXT, name TEXT, project_id INTEGER)''')
+    c.execute("CREATE TABLE IF NOT EXISTS name_deletes (variant TEXT, name_id INTEGER)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_name_deletes_variant ON name_deletes (variant)")
+    # One row per normalized name: the UNIQUE index is what makes issuing a name atomic across workers
+    if not c.execute("SELECT 1 FROM sqlite_master WHERE name = 'idx_name_index_norm_unique'").fetchone():
+        c.execute('''DELETE FROM name_deletes WHERE name_id IN
+                     (SELECT id FROM name_index WHERE id NOT IN (SELECT MIN(id) FROM name_index GROUP BY norm))''')
+        c.execute("DELETE FROM name_index WHERE id NOT IN (SELECT MIN(id) FROM name_index GROUP BY norm)")
+        c.execute("DROP INDEX IF EXISTS idx_name_index_norm")
+        c.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_name_index_norm_unique ON name_index (norm)")
+    c.execute("CREATE TABLE IF NOT EXISTS name_index_meta (key TEXT PRIMARY KEY, value TEXT)")
     conn.commit()
     conn.close()
 
-init_db()
+# Per-process services, built by init_services() when a worker starts (see lifespan)
+brief_index = None
+name_index = None
+image_cache = None
+orchestrator = None
+job_queue = None
+bulk_forge = None
+
+IMAGE_PREFETCH = os.getenv("IMAGE_PREFETCH", "true").lower() in ("1", "true", "yes")
+
+# Creative fields that can be reused from a near-identical past brief. Names never are:
+# the stored ones were issued to that project, so fresh ones are always drawn
+CREATIVE_FIELDS = ["taglines", "description", "colors", "socialPost", "bio", "brandStory"]
+
+# Keys an LLM creative generation must contain to be used; the rest get empty defaults
+CREATIVE_REQUIRED = ("taglines", "description")
+CREATIVE_DEFAULTS = {"socialPost": "", "bio": "", "brandStory": "", "colors": []}
+
+def find_similar_creative(input_data):
+    brief_index.sync('brand_forge.db')
+    match = brief_index.nearest(input_data.dict())
+    if not match:
+        return None
+
+    project_id, similarity = match
+    conn = sqlite3.connect('brand_forge.db')
+    row = conn.execute("SELECT result, creative_source FROM projects WHERE id = ?", (project_id,)).fetchone()
+    conn.close()
+    if not row:
+        return None
+
+    print(f"Reusing creative from project {project_id} (similarity {similarity:.2f})")
+    stored = json.loads(row[0])
+    creative = {k: stored[k] for k in CREATIVE_FIELDS if k in stored}
+    creative["_source"] = row[1]
+    return creative
+
+async def creative_for(input_data, regenerate=False):
+    # regenerate skips both past-project reuse and the short-lived stage cache, for new copy
+    creative = None if regenerate else find_similar_creative(input_data)
+    if creative is None:
+        creative = await orchestrator.coalesced("creative", orchestrator.generate_creative, input_data, fresh=regenerate)
+    return creative
+
+def public_creative(creative):
+    # "_source" is provenance for the projects table, not part of the API response
+    return {k: v for k, v in creative.items() if k != "_source"}
 
 # Models
 class BrandInput(BaseModel):
@@ -101,6 +208,12 @@ class BrandResult(BaseModel):
     confidence: Optional[float] = None
     brandStory: Optional[str] = None
 
+TONE_LABELS = {
+    "positive": "Positive & Uplifting",
+    "neutral": "Balanced & Professional",
+    "negative": "Serious or Concerned" # Contextual mapping
+}
+
 # Services
 class AIOrchestrator:
     def __init__(self):
@@ -128,7 +241,40 @@ class AIOrchestrator:
         self.sd_key = os.getenv("STABLE_DIFFUSION_API_KEY")
         self.groq_key = os.getenv("GROQ_API_KEY")
 
-    async def generate_creative(self, input_data: BrandInput):
+        # Identical concurrent requests share one upstream call per stage; finished
+        # results are also cached briefly in SQLite so other worker processes reuse them
+        self.inflight = SingleFlight()
+        self.cache = SharedCache('brand_forge.db', ttl=int(os.getenv("STAGE_CACHE_TTL", 60)))
+
+        # Names come from the local engine; LLMs are only asked for prose
+        self.name_engine = NameEngine()
+
+        # Tone and keywords are scored locally; Watson/HF only refine when REMOTE_ANALYSIS is set
+        self.analyzer = TextAnalyzer()
+        self.remote_analysis = os.getenv("REMOTE_ANALYSIS", "").lower() in ("1", "true", "yes")
+
+    async def coalesced(self, stage, fn, input_data, *args, fresh=False):
+        key = (stage, normalize_input(input_data)) + args
+        cache_key = SharedCache.make_key(*key)
+        cached = None if fresh else self.cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        async def load():
+            if inspect.iscoroutinefunction(fn):
+                result = await fn(input_data, *args)
+            else:
+                result = await asyncio.to_thread(fn, input_data, *args)
+            if not (isinstance(result, dict) and "error" in result):
+                self.cache.set(cache_key, result)
+            return result
+
+        return await self.inflight.do(key, load)
+
+    def generate_names(self, input_data: BrandInput, count=30):
+        return self.name_engine.generate(input_data.dict(), count)
+
+    def generate_creative(self, input_data: BrandInput):
         # 1. Try Groq (Llama-3.3-70B-Versatile) - PRIMARY for Text
         if self.groq_key:
             try:
@@ -147,7 +293,6 @@ class AIOrchestrator:
                             Audience: {input_data.audience}. Values: {input_data.values}. Tone: {input_data.tone}.
 
                             Return ONLY a valid JSON object with these exact keys:
-                            - "names": array of 30 unique brand names strings.
                             - "taglines": array of 3 taglines strings.
                             - "description": a 3-sentence brand description string.
                             - "socialPost": a social media post string with emojis.
@@ -163,7 +308,10 @@ class AIOrchestrator:
                 
                 if response.status_code == 200:
                     content = response.json()['choices'][0]['message']['content']
-                    return json.loads(content)
+                    creative = extract_json(content, CREATIVE_REQUIRED, CREATIVE_DEFAULTS)
+                    creative["_source"] = "groq"
+                    creative["names"] = self.generate_names(input_data)
+                    return creative
                 else:
                     print(f"Groq API Error: {response.text}")
             except Exception as e:
@@ -173,25 +321,22 @@ class AIOrchestrator:
         if not self.hf_key:
             print("HuggingFace API Key missing. Falling back to simple template.")
             return {
-                "names": [f"{input_data.industry}Plus", f"{input_data.industry}Nova", "BrandLink", "Vista", "Spark"],
+                "names": self.generate_names(input_data),
                 "taglines": [f"Leading {input_data.industry} solutions.", "Innovate successfully."],
                 "description": f"A leading {input_data.industry} firm focused on {input_data.values}.",
                 "colors": [{"hex": "#00FF88", "name": "Standard Green"}, {"hex": "#0EA5E9", "name": "Standard Blue"}],
                 "voiceTraits": [input_data.tone, "Professional"],
                 "socialPost": f"Hello world! We are a new {input_data.industry} company. #Launch",
                 "bio": f"We are experts in {input_data.industry} delivering quality services.",
-                "brandStory": f"Founded to revolutionize {input_data.industry}, we bring {input_data.values} to life."
+                "brandStory": f"Founded to revolutionize {input_data.industry}, we bring {input_data.values} to life.",
+                "_source": "template"
             }
 
-        API_URL = "https://api-inference.huggingface.co/models/mistralai/Mistral-7B-Instruct-v0.2"
-        headers = {"Authorization": f"Bearer {self.hf_key}"}
-
         prompt = f"""[INST] You are a creative brand strategist.
 Create a JSON object for a {input_data.industry} brand.
 Audience: {input_data.audience}. Values: {input_data.values}. Tone: {input_data.tone}.
 
 Return ONLY a valid JSON object with these exact keys:
-- "names": array of 15 unique brand names strings.
 - "taglines": array of 3 taglines strings.
 - "description": a 3-sentence brand description string.
 - "socialPost": a social media post string with emojis.
@@ -203,51 +348,64 @@ Do not include any explanation, only the JSON.
 [/INST]"""
 
         try:
-            # Use temperature 0.7 for creativity but strict JSON
-            response = requests.post(API_URL, headers=headers, json={"inputs": prompt, "parameters": {"max_new_tokens": 1000, "return_full_text": False, "temperature": 0.7}})
-            response.raise_for_status()
-            
-            result_json = response.json()
-            generated_text = ""
-            
-            if isinstance(result_json, list) and len(result_json) > 0:
-                generated_text = result_json[0].get("generated_text", "")
-            elif isinstance(result_json, dict):
-                 generated_text = result_json.get("generated_text", "")
-
-            # Robust cleanup for JSON parsing
-            clean_text = generated_text.strip()
-            if "```json" in clean_text:
-                clean_text = clean_text.split("```json")[1].split("```")[0]
-            elif "```" in clean_text:
-                clean_text = clean_text.split("```")[1].split("```")[0]
-            
-            # Remove any trailing text after last brace to prevent JSONDecodeError
-            if "}" in clean_text:
-                clean_text = clean_text[:clean_text.rfind("}")+1]
-
-            return json.loads(clean_text)
+            # Stream tokens and stop as soon as the top-level object closes, instead of
+            # paying for up to 1000 tokens of trailing chatter and re-parsing afterwards
+            extractor = JSONObjectExtractor()
+            # The client owns the streamed HTTP response (via its exit stack), so leaving the
+            # with-block closes the connection, which ends generation upstream
+            with InferenceClient(api_key=self.hf_key) as client:
+                stream = client.text_generation(
+                    prompt,
+                    model="mistralai/Mistral-7B-Instruct-v0.2",
+                    max_new_tokens=1000,
+                    temperature=0.7,
+                    stream=True
+                )
+                try:
+                    for token in stream:
+                        if extractor.feed(token):
+                            break
+                except Exception as e:
+                    # A dropped stream still leaves a usable prefix for parse() to repair
+                    if not extractor.started:
+                        raise
+                    print(f"Hugging Face stream interrupted: {e}")
+
+            # Truncated output is repaired (open strings/arrays closed, trailing commas dropped)
+            creative = extractor.parse(CREATIVE_REQUIRED, CREATIVE_DEFAULTS)
+            creative["_source"] = "mistral"
+            creative["names"] = self.generate_names(input_data)
+            return creative
 
         except Exception as e:
             print(f"Hugging Face Creative Generation failed: {e}")
             # Fallback to simple template on failure
             return {
-                "names": [f"{input_data.industry}X", "GenBrand"],
+                "names": self.generate_names(input_data),
                 "taglines": ["Error generating complex creative."],
                 "description": "Standard description due to generation error.",
                 "colors": [{"hex": "#CCCCCC", "name": "Grey"}],
                 "voiceTraits": [input_data.tone],
                 "socialPost": "Launch post.",
                 "bio": "Standard bio.",
-                "brandStory": "Standard story."
+                "brandStory": "Standard story.",
+                "_source": "template"
             }
 
+    def _strategy_text(self, input_data: BrandInput, keywords, categories):
+        return f"Strategic positioning focuses on {categories[0] if categories else 'market leadership'}. " \
+               f"We recommend emphasizing {', '.join(keywords[:3])} to resonate with {input_data.audience}. " \
+               f"For example, a targeted campaign on '{keywords[0]}' could yield high engagement."
+
+    def _strategy_input(self, input_data: BrandInput, context: str = ""):
+        return f"{context} {input_data.industry} brand values: {input_data.values}. Target: {input_data.audience}."
+
     def generate_strategy(self, input_data: BrandInput, context: str = ""):
-        # Primary: Try IBM Watson NLU
-        if hasattr(self, 'nlu'):
+        text_to_analyze = self._strategy_input(input_data, context)
+
+        # Optional refinement: IBM Watson NLU (network round-trip, adds categories)
+        if self.remote_analysis and hasattr(self, 'nlu'):
             try:
-                # Analyze context + input
-                text_to_analyze = f"{context} {input_data.industry} brand values: {input_data.values}. Target: {input_data.audience}."
                 response = self.nlu.analyze(
                     text=text_to_analyze,
                     features=Features(keywords=KeywordsOptions(limit=5), categories=CategoriesOptions(limit=3))
@@ -256,20 +414,23 @@ Do not include any explanation, only the JSON.
                 keywords = [k['text'] for k in response['keywords']]
                 categories = [c['label'] for c in response['categories']]
                 
-                # Formulate strategy based on analysis
-                strategy_text = f"Strategic positioning focuses on {categories[0] if categories else 'market leadership'}. " \
-                                f"We recommend emphasizing {', '.join(keywords[:3])} to resonate with {input_data.audience}. " \
-                                f"For example, a targeted campaign on '{keywords[0]}' could yield high engagement."
-                
                 return {
-                    "strategy": strategy_text,
+                    "strategy": self._strategy_text(input_data, keywords, categories),
                     "keywords": keywords
                 }
             except Exception as e:
                 print(f"IBM Watson Analysis Error: {e}")
-                # Fallthrough to Gemini fallback
-        
-        # Fallback: Use Gemini for Strategy if Watson fails or is missing
+                # Fallthrough to local analysis
+
+        # Primary: local RAKE keyword extraction
+        keywords = self.analyzer.keywords_batch([text_to_analyze])[0]
+        if keywords:
+            return {
+                "strategy": self._strategy_text(input_data, keywords, [input_data.industry]),
+                "keywords": keywords
+            }
+
+        # Fallback: Use Gemini for Strategy if no keywords could be extracted
         if self.gemini_model:
             try:
                 prompt = f"""Generate a strategic brand positioning statement for a {input_data.industry} brand with values '{input_data.values}'.
@@ -285,43 +446,51 @@ Do not include any explanation, only the JSON.
 
         return {"strategy": "Strategy generation unavailable.", "keywords": []}
 
-    async def analyze_tone(self, input_data: BrandInput):
-        # Fallback if key is missing
-        if not self.hf_key:
-            return {"sentiment": "Neutral (Default)", "confidence": 0.5}
+    def generate_strategy_batch(self, inputs: List[BrandInput]):
+        texts = [self._strategy_input(item) for item in inputs]
+        results = []
+        for item, keywords in zip(inputs, self.analyzer.keywords_batch(texts)):
+            strategy = self._strategy_text(item, keywords, [item.industry]) if keywords else "Strategy generation unavailable."
+            results.append({"strategy": strategy, "keywords": keywords})
+        return results
 
-        API_URL = "https://api-inference.huggingface.co/models/cardiffnlp/twitter-roberta-base-sentiment-latest"
-        headers = {"Authorization": f"Bearer {self.hf_key}"}
+    def _tone_input(self, input_data: BrandInput):
+        return f"{input_data.values}. {input_data.tone}."
 
-        try:
-            # Analyze the brand values and tone description
-            payload = {"inputs": f"{input_data.values}. {input_data.tone}."}
-            response = requests.post(API_URL, headers=headers, json=payload)
-            response.raise_for_status()
-            
-            # Extract top sentiment
-            results = response.json()
-            # HF returns list of lists sometimes [[{label, score}, ...]]
-            if isinstance(results, list) and len(results) > 0:
-                scores = results[0]  # Take the first result set
-                # Find the label with highest score
-                top_sentiment = max(scores, key=lambda x: x['score'])
-                
-                label_map = {
-                    "positive": "Positive & Uplifting",
-                    "neutral": "Balanced & Professional",
-                    "negative": "Serious or Concerned" # Contextual mapping
-                }
-                
-                return {
-                    "sentiment": label_map.get(top_sentiment['label'], top_sentiment['label']), 
-                    "confidence": round(top_sentiment['score'], 2)
-                }
+    def analyze_tone(self, input_data: BrandInput):
+        # Optional refinement: HF cardiffnlp sentiment model (network round-trip)
+        if self.remote_analysis and self.hf_key:
+            API_URL = "https://api-inference.huggingface.co/models/cardiffnlp/twitter-roberta-base-sentiment-latest"
+            headers = {"Authorization": f"Bearer {self.hf_key}"}
+
+            try:
+                # Analyze the brand values and tone description
+                payload = {"inputs": self._tone_input(input_data)}
+                response = requests.post(API_URL, headers=headers, json=payload)
+                response.raise_for_status()
                 
-        except Exception as e:
-            print(f"Hugging Face Tone Analysis failed: {e}")
-            
-        return {"sentiment": "Analysis Unavailable", "confidence": 0.0}
+                # Extract top sentiment
+                results = response.json()
+                # HF returns list of lists sometimes [[{label, score}, ...]]
+                if isinstance(results, list) and len(results) > 0:
+                    scores = results[0]  # Take the first result set
+                    # Find the label with highest score
+                    top_sentiment = max(scores, key=lambda x: x['score'])
+                    
+                    return {
+                        "sentiment": TONE_LABELS.get(top_sentiment['label'], top_sentiment['label']), 
+                        "confidence": round(top_sentiment['score'], 2)
+                    }
+                    
+            except Exception as e:
+                print(f"Hugging Face Tone Analysis failed: {e}")
+
+        # Primary: local lexicon scorer
+        return self.analyze_tone_batch([input_data])[0]
+
+    def analyze_tone_batch(self, inputs: List[BrandInput]):
+        scores = self.analyzer.sentiment_batch([self._tone_input(item) for item in inputs])
+        return [{"sentiment": TONE_LABELS[s["label"]], "confidence": s["confidence"]} for s in scores]
 
     def generate_visuals(self, input_data: BrandInput):
         # 1. Refine prompt
@@ -432,19 +601,68 @@ Do not include any explanation, only the JSON.
         if not logo_url:
             print("Falling back to Pollinations.ai for logo...")
             encoded_prompt = requests.utils.quote(logo_prompt)
-            logo_url = f"https://image.pollinations.ai/prompt/{encoded_prompt}?width=512&height=512&nologo=true"
+            logo_url = image_cache.proxy(f"https://image.pollinations.ai/prompt/{encoded_prompt}?width=512&height=512&nologo=true", prefetch=IMAGE_PREFETCH)
 
         # Generate Moodboard URL (Pollinations matches well for this)
         mood_prompt = f"Moodboard for {input_data.industry}, {input_data.values}, {input_data.tone}, color palette, high quality photography"
         encoded_mood = requests.utils.quote(mood_prompt)
-        moodboard_url = f"https://image.pollinations.ai/prompt/{encoded_mood}?width=800&height=400&nologo=true"
+        moodboard_url = image_cache.proxy(f"https://image.pollinations.ai/prompt/{encoded_mood}?width=800&height=400&nologo=true", prefetch=IMAGE_PREFETCH)
 
         return {
             "logoUrl": logo_url,
             "moodboardUrl": moodboard_url
         }
 
-    async def generate_content_forge(self, input_data: ContentForgeInput):
+    def generate_content_forge(self, input_data: ContentForgeInput):
+        return self.forge_content(input_data)
+
+    def _forge_groq(self, prompt, attempts=int(os.getenv("FORGE_RETRIES", 4)), backoff=1.0):
+        """One Groq JSON completion, retried with exponential backoff on rate limits and server errors.
+
+        Errors that persist after every attempt are marked "retryable" so callers can tell
+        an overloaded API apart from a bad request.
+        """
+        body = {
+            "model": "llama-3.3-70b-versatile",
+            "messages": [
+                {"role": "system", "content": "You are an expert copywriter. Output strictly valid JSON."},
+                {"role": "user", "content": prompt}
+            ],
+            "temperature": 0.7,
+            "response_format": {"type": "json_object"}
+        }
+
+        for attempt in range(attempts):
+            try:
+                response = requests.post(
+                    "https://api.groq.com/openai/v1/chat/completions",
+                    headers={
+                        "Authorization": f"Bearer {self.groq_key}",
+                        "Content-Type": "application/json"
+                    },
+                    json=body,
+                    timeout=120
+                )
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error, retry_after = f"Groq Error: {e}", None
+            else:
+                if response.status_code == 200:
+                    content_str = response.json()['choices'][0]['message']['content']
+                    return json.loads(content_str)
+                if response.status_code != 429 and response.status_code < 500:
+                    return {"error": f"Groq Error: {response.text}"}
+                error, retry_after = f"Groq Error {response.status_code}: {response.text}", response.headers.get("Retry-After")
+
+            if attempt + 1 < attempts:
+                try:
+                    delay = float(retry_after)
+                except (TypeError, ValueError):
+                    delay = backoff * 2 ** attempt + random.uniform(0, backoff)
+                print(f"Groq busy (attempt {attempt + 1}/{attempts}), retrying in {delay:.1f}s")
+                time.sleep(min(delay, 30))
+        return {"error": error, "retryable": True}
+
+    def forge_content(self, input_data: ContentForgeInput):
         if not self.groq_key:
             return {"error": "Groq API Key missing"}
 
@@ -472,38 +690,157 @@ Do not include any explanation, only the JSON.
                 - "email_subject": The email subject line string.
                 - "email_body": The email body text string.
                 """
-            
-            response = requests.post(
-                "https://api.groq.com/openai/v1/chat/completions",
-                headers={
-                    "Authorization": f"Bearer {self.groq_key}",
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "model": "llama-3.3-70b-versatile",
-                    "messages": [
-                        {"role": "system", "content": "You are an expert copywriter. Output strictly valid JSON."},
-                        {"role": "user", "content": prompt}
-                    ],
-                    "temperature": 0.7,
-                    "response_format": {"type": "json_object"}
-                }
-            )
-            
-            if response.status_code == 200:
-                content_str = response.json()['choices'][0]['message']['content']
-                return json.loads(content_str)
-            else:
-                 return {"error": f"Groq Error: {response.text}"}
+
+            return self._forge_groq(prompt)
         except Exception as e:
             return {"error": str(e)}
 
-orchestrator = AIOrchestrator()
+    def forge_content_packed(self, inputs: List[ContentForgeInput]):
+        """Describes several short products in one Groq call. Returns one result (or None) per input."""
+        if not self.groq_key:
+            return [{"error": "Groq API Key missing"} for _ in inputs]
+
+        products = "\n".join(
+            f'{i}. "{item.productName}" ({item.tone or "Professional"} tone): {item.productDescription}'
+            for i, item in enumerate(inputs)
+        )
+        prompt = f"""Write product descriptions for each of these {len(inputs)} products:
+        {products}
+
+        Return ONLY a valid JSON object with one key "items": an array with one object per product, in order, each with:
+        - "id": the product number.
+        - "short": A 1-sentence punchy description string.
+        - "long": A 3-paragraph detailed description string.
+        - "bullets": An array of 5 strings (customer benefits).
+        """
 
-@app.post("/api/generate", response_model=BrandResult)
-async def generate_brand(input_data: BrandInput):
-    # 1. Generate Creative Content (Gemini)
-    creative = await orchestrator.generate_creative(input_data)
+        try:
+            data = self._forge_groq(prompt)
+        except Exception as e:
+            data = {"error": str(e)}
+        if data.get("retryable"):
+            # Still rate limited after backing off: splitting into N single calls would only add load
+            return [dict(data) for _ in inputs]
+        if "error" in data:
+            return [None] * len(inputs)
+
+        # Anything missing or malformed comes back as None and is retried on its own
+        results = [None] * len(inputs)
+        for item in data.get("items", []):
+            if not isinstance(item, dict):
+                continue
+            try:
+                index = int(item.get("id"))
+            except (TypeError, ValueError):
+                continue
+            if 0 <= index < len(inputs) and all(k in item for k in ("short", "long", "bullets")):
+                results[index] = {"short": item["short"], "long": item["long"], "bullets": item["bullets"]}
+        return results
+
+PALETTE_WAIT_SECONDS = float(os.getenv("PALETTE_WAIT_SECONDS", 15))
+
+def local_logo_path(url, timeout=PALETTE_WAIT_SECONDS):
+    prefix = "http://localhost:8000/static/"
+    if url and url.startswith(prefix):
+        path = os.path.join("static", *url[len(prefix):].split("/"))
+        if os.path.exists(path):
+            return path
+
+    # Proxied Pollinations logos are usually already prefetching; wait (at most timeout) for the file
+    key = image_cache.key_from_url(url)
+    if key:
+        try:
+            return image_cache.fetch(key, timeout=timeout)[0]
+        except TimeoutError:
+            pass
+        except Exception as e:
+            print(f"Logo not available for palette extraction: {e}")
+    return None
+
+def palette_from_logo(url, timeout=PALETTE_WAIT_SECONDS):
+    path = local_logo_path(url, timeout)
+    if not path:
+        return []
+    try:
+        colors = get_pool().submit(extract_palette, path).result(timeout=30)
+    except Exception as e:
+        print(f"Palette extraction failed: {e}")
+        return []
+    # An all-gray palette usually means a monochrome mark; the prompt colors say more
+    return colors if has_brand_color(colors) else []
+
+def run_visuals_job(payload):
+    visuals = orchestrator.generate_visuals(BrandInput(**payload))
+    visuals["colors"] = palette_from_logo(visuals.get("logoUrl"))
+    return visuals
+
+def run_logo_palette_job(payload):
+    # Deferred from /api/generate when the logo was still rendering: swap in its palette once it lands
+    colors = palette_from_logo(payload["logoUrl"])
+    if colors:
+        conn = sqlite3.connect('brand_forge.db', timeout=10)
+        try:
+            row = conn.execute("SELECT result FROM projects WHERE id = ?", (payload["projectId"],)).fetchone()
+            if row:
+                result = json.loads(row[0])
+                result["colors"] = colors
+                conn.execute("UPDATE projects SET result = ? WHERE id = ?", (json.dumps(result), payload["projectId"]))
+                conn.commit()
+        finally:
+            conn.close()
+    return {"projectId": payload["projectId"], "colors": colors}
+
+async def run_bulk_forge(payload):
+    return await bulk_forge.run(payload["runId"], lambda forge_type, fields: ContentForgeInput(type=forge_type, **fields))
+
+def init_services():
+    """Builds this process's clients, indexes and job queue.
+
+    Called from the lifespan hook rather than at import, so gunicorn --preload can load the
+    app in the master without forking threads, sockets or SQLite handles into the workers.
+    Scripts that use the orchestrator directly call it themselves.
+    """
+    global brief_index, name_index, image_cache, orchestrator, job_queue, bulk_forge
+    if orchestrator is not None:
+        return
+
+    # Near-duplicate brief lookup, built from past projects and kept current by sync()
+    brief_index = BriefIndex(threshold=float(os.getenv("BRIEF_SIMILARITY_THRESHOLD", 0.9)))
+
+    # Every name ever issued, so new projects never get a name (or a near-copy) another client has
+    name_index = NameIndex('brand_forge.db', 'brand_forge.names.bloom', capacity=int(os.getenv("NAME_INDEX_CAPACITY", 500000)))
+
+    # Local proxy for Pollinations renders, so each image is generated once and served with cache headers
+    image_cache = ImageCache(
+        'brand_forge.db',
+        os.path.join("static", "image_cache"),
+        "http://localhost:8000",
+        max_bytes=int(os.getenv("IMAGE_CACHE_MAX_MB", 512)) * 1024 * 1024
+    )
+
+    orchestrator = AIOrchestrator()
+
+    # Background jobs for slow stages (visual generation holds a request open for tens of seconds)
+    job_queue = JobQueue('brand_forge.db', workers=int(os.getenv("JOB_WORKERS", 2)))
+    job_queue.register("visuals", run_visuals_job)
+    job_queue.register("logo_palette", run_logo_palette_job)
+    job_queue.register("forge_bulk", run_bulk_forge)
+
+    # Bulk Content Forge: catalogs are spooled to disk and processed as a resumable job
+    bulk_forge = BulkForgeRunner(
+        'brand_forge.db',
+        os.path.join("static", "forge_bulk"),
+        orchestrator.forge_content,
+        orchestrator.forge_content_packed,
+        concurrency=int(os.getenv("FORGE_BULK_CONCURRENCY", 4)),
+        pack_size=int(os.getenv("FORGE_PACK_SIZE", 5))
+    )
+
+
+@router.post("/api/generate", response_model=BrandResult)
+async def generate_brand(input_data: BrandInput, regenerate: bool = False):
+    # 1. Generate Creative Content (Groq), unless a near-identical brief was already answered
+    creative = await creative_for(input_data, regenerate)
     
     # Extract generated copy for analysis
     brand_description = creative.get('description', '')
@@ -511,11 +848,11 @@ async def generate_brand(input_data: BrandInput):
     
     # 2. Analyze the AI-generated content (IBM Watson & HuggingFace)
     # This fulfills the request: Prompt -> Gemini -> Response -> IBM Analysis
-    strategy = orchestrator.generate_strategy(input_data, context=f"{brand_description} {brand_tagline}")
-    tone_data = await orchestrator.analyze_tone(input_data) 
+    strategy = await orchestrator.coalesced("strategy", orchestrator.generate_strategy, input_data, f"{brand_description} {brand_tagline}")
+    tone_data = await orchestrator.coalesced("tone", orchestrator.analyze_tone, input_data)
     
     # 3. Generate Visuals (Parallel or Dependent)
-    visuals = orchestrator.generate_visuals(input_data)
+    visuals = await orchestrator.coalesced("visuals", orchestrator.generate_visuals, input_data)
 
     # Normalize colors if needed
     colors = creative.get('colors', [])
@@ -524,11 +861,26 @@ async def generate_brand(input_data: BrandInput):
         if isinstance(c, str):
              formatted_colors.append({"hex": c, "name": "Brand Color"})
         else:
-             formatted_colors.append(c)
+             formatted_colors.append({"hex": c.get("hex", ""), "name": c.get("name", "Brand Color")})
+
+    # Prefer the palette actually present in the generated logo over the LLM's guess, but only
+    # if the logo is already on disk; a still-rendering logo is handled after the response
+    logo_url = visuals.get('logoUrl')
+    logo_ready = await asyncio.to_thread(local_logo_path, logo_url, 0)
+    if logo_ready:
+        logo_colors = await asyncio.to_thread(palette_from_logo, logo_url, 0)
+        if logo_colors:
+            formatted_colors = logo_colors
+
+    # Drop names already issued to other projects, topping up with fresh draws from the local
+    # engine (wider each round) so a brief that keeps coming back does not run out of names
+    brief = input_data.dict()
+    draw_names = lambda round_number, tried: orchestrator.name_engine.generate(brief, 120, exclude=tried, variety=round_number + 1)
+    names = await asyncio.to_thread(name_index.top_up, creative.get('names', []), draw_names)
 
     # Combine results
     result = {
-        "names": creative.get('names', []),
+        "names": names,
         "taglines": [creative.get('tagline', '')] if 'tagline' in creative else creative.get('taglines', []),
         "description": creative.get('description', ''),
         "colors": formatted_colors,
@@ -544,45 +896,189 @@ async def generate_brand(input_data: BrandInput):
         "confidence": tone_data.get('confidence') # New Field
     }
 
+    # Serialize once: the same bytes go to SQLite and to the client, skipping a second
+    # response_model validation pass (the dict above is already BrandResult-shaped)
+    payload = orjson.dumps(result)
+
     # Save to DB
     conn = sqlite3.connect('brand_forge.db')
     c = conn.cursor()
-    c.execute("INSERT INTO projects (input, result) VALUES (?, ?)", (json.dumps(input_data.dict()), json.dumps(result)))
+    c.execute(
+        "INSERT INTO projects (input, result, creative_source) VALUES (?, ?, ?)",
+        (orjson.dumps(input_data.dict()).decode(), payload.decode(), creative.get("_source"))
+    )
+    project_id = c.lastrowid
     conn.commit()
+
+    # Claiming is atomic; names a concurrent request took in the meantime are re-drawn
+    issued = await asyncio.to_thread(name_index.issue, names, draw_names, project_id)
+    if issued != names:
+        result["names"] = issued
+        payload = orjson.dumps(result)
+        c.execute("UPDATE projects SET result = ? WHERE id = ?", (payload.decode(), project_id))
+        conn.commit()
     conn.close()
+    brief_index.sync('brand_forge.db')
+    if logo_url and not logo_ready:
+        job_queue.submit("logo_palette", {"projectId": project_id, "logoUrl": logo_url}, dedupe_key=str(project_id))
 
-    return result
+    return Response(content=payload, media_type="application/json")
 
 # Modular Endpoints for RESTful Design
-@app.post("/api/generate/creative")
-async def generate_creative_endpoint(input_data: BrandInput):
-    return await orchestrator.generate_creative(input_data)
-
-@app.post("/api/generate/strategy")
+@router.post("/api/generate/creative")
+async def generate_creative_endpoint(input_data: BrandInput, regenerate: bool = False):
+    creative = public_creative(await creative_for(input_data, regenerate))
+    # Names are drawn fresh and checked against the registry, never copied from a past project
+    brief = input_data.dict()
+    creative["names"] = await asyncio.to_thread(
+        name_index.top_up,
+        creative.get("names", []),
+        lambda round_number, tried: orchestrator.name_engine.generate(brief, 120, exclude=tried, variety=round_number + 1)
+    )
+    return creative
+
+@router.post("/api/generate/strategy")
 async def generate_strategy_endpoint(input_data: BrandInput):
     # Context is optional here, passing empty string
-    return orchestrator.generate_strategy(input_data)
+    return await orchestrator.coalesced("strategy", orchestrator.generate_strategy, input_data)
 
-@app.post("/api/generate/visuals")
+@router.post("/api/generate/visuals", status_code=202)
 async def generate_visuals_endpoint(input_data: BrandInput):
-    return orchestrator.generate_visuals(input_data)
+    # Queued instead of rendered inline; poll /api/jobs/{id} or subscribe to its events
+    job_id = job_queue.submit("visuals", input_data.dict(), dedupe_key=json.dumps(normalize_input(input_data)))
+    return {
+        "jobId": job_id,
+        "status": "queued",
+        "statusUrl": f"/api/jobs/{job_id}",
+        "eventsUrl": f"/api/jobs/{job_id}/events"
+    }
 
-@app.post("/api/generate/tone")
+@router.get("/api/jobs/{job_id}")
+def get_job(job_id: str):
+    job = job_queue.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@router.get("/api/jobs/{job_id}/events")
+async def job_events(job_id: str):
+    if not job_queue.get(job_id):
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    # Server-Sent Events: push status changes until the job is done or failed
+    async def stream():
+        last_status = None
+        while True:
+            job = job_queue.get(job_id)
+            if job["status"] != last_status:
+                last_status = job["status"]
+                yield f"event: {last_status}\ndata: {json.dumps(job)}\n\n"
+            if last_status in ("done", "failed"):
+                return
+            await job_queue.wait(job_id, timeout=2.0)
+
+    return StreamingResponse(stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+@router.post("/api/generate/tone")
 async def generate_tone_endpoint(input_data: BrandInput):
-    return await orchestrator.analyze_tone(input_data)
+    return await orchestrator.coalesced("tone", orchestrator.analyze_tone, input_data)
+
+@router.post("/api/generate/tone/batch")
+async def generate_tone_batch_endpoint(inputs: List[BrandInput]):
+    # Scored locally in one pass; remote refinement is per-request only
+    return orchestrator.analyze_tone_batch(inputs)
 
-@app.post("/api/forge/generate")
+@router.post("/api/generate/strategy/batch")
+async def generate_strategy_batch_endpoint(inputs: List[BrandInput]):
+    return orchestrator.generate_strategy_batch(inputs)
+
+@router.post("/api/forge/generate")
 async def forge_generate_endpoint(input_data: ContentForgeInput):
-    res = await orchestrator.generate_content_forge(input_data)
+    res = await orchestrator.coalesced("forge", orchestrator.generate_content_forge, input_data)
     if "error" in res:
         raise HTTPException(status_code=500, detail=res["error"])
     return res
 
-@app.get("/api/health")
+@router.get("/api/images/{key}")
+async def proxied_image(key: str, request: Request):
+    row = image_cache.lookup(key)
+    if not row:
+        raise HTTPException(status_code=404, detail="Image not found")
+
+    # Keys are content-addressed by source URL, so a matching ETag never goes stale
+    etag = f'"{key}"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+
+    try:
+        path, content_type = await asyncio.wrap_future(image_cache.fetch_future(key))
+    except Exception as e:
+        print(f"Image proxy fetch failed: {e}")
+        # Let the client try the origin directly rather than showing nothing
+        return RedirectResponse(row[0], status_code=302)
+
+    return FileResponse(path, media_type=content_type, headers={
+        "Cache-Control": "public, max-age=31536000, immutable",
+        "ETag": etag
+    })
+
+@router.get("/api/names/check")
+def check_name(name: str):
+    return {
+        "name": name,
+        "taken": name_index.exact(name),
+        "similar": name_index.neighbours(name)
+    }
+
+@router.get("/api/names/search")
+def search_names(prefix: str, limit: int = 20):
+    return name_index.prefix(prefix, min(limit, 100))
+
+@router.post("/api/forge/bulk", status_code=202)
+async def forge_bulk_endpoint(request: Request, format: Optional[str] = None, type: str = "description", tone: Optional[str] = None):
+    # Body is the raw CSV or JSONL catalog, streamed to disk rather than buffered
+    content_type = request.headers.get("content-type", "")
+    fmt = format or ("csv" if "csv" in content_type else "jsonl")
+    if fmt not in ("csv", "jsonl"):
+        raise HTTPException(status_code=400, detail="format must be 'csv' or 'jsonl'")
+    if type not in ("description", "social-email"):
+        raise HTTPException(status_code=400, detail="type must be 'description' or 'social-email'")
+
+    run_id = await bulk_forge.create_run(fmt, type, tone, request.stream())
+    job_id = job_queue.submit("forge_bulk", {"runId": run_id}, dedupe_key=run_id)
+    return {
+        "runId": run_id,
+        "jobId": job_id,
+        "statusUrl": f"/api/forge/bulk/{run_id}",
+        "resultsUrl": f"/api/forge/bulk/{run_id}/results"
+    }
+
+@router.get("/api/forge/bulk/{run_id}")
+def forge_bulk_status(run_id: str):
+    progress = bulk_forge.progress(run_id)
+    if not progress:
+        raise HTTPException(status_code=404, detail="Bulk run not found")
+    return progress
+
+@router.get("/api/forge/bulk/{run_id}/results")
+def forge_bulk_results(run_id: str):
+    if not bulk_forge.progress(run_id):
+        raise HTTPException(status_code=404, detail="Bulk run not found")
+    return StreamingResponse(bulk_forge.iter_results(run_id), media_type="application/x-ndjson")
+
+@router.post("/api/forge/bulk/{run_id}/resume", status_code=202)
+def forge_bulk_resume(run_id: str):
+    progress = bulk_forge.progress(run_id)
+    if not progress:
+        raise HTTPException(status_code=404, detail="Bulk run not found")
+    job_id = job_queue.submit("forge_bulk", {"runId": run_id}, dedupe_key=run_id)
+    return {"runId": run_id, "jobId": job_id, "checkpoint": progress["checkpoint"]}
+
+@router.get("/api/health")
 def health_check():
     return {"status": "ok"}
 
-@app.get("/api/verify-keys")
+@router.get("/api/verify-keys")
 async def verify_keys():
     status = {
         "gemini": {"role": "Logo Prompts, Strategy Fallback & Chat Fallback", "status": "missing", "message": "Key not configured"},
@@ -640,7 +1136,7 @@ class ChatRequest(BaseModel):
     message: str
     history: List[dict] = [] # Optional context: [{"role": "user", "parts": ["..."]}, ...]
 
-@app.post("/api/chat")
+@router.post("/api/chat")
 async def chat_endpoint(request: ChatRequest):
     # 1. Try Groq (Llama-3) - PRIMARY (Fast & Reliable)
     if orchestrator.groq_key:
@@ -701,7 +1197,8 @@ async def chat_endpoint(request: ChatRequest):
             
             response = requests.post(API_URL, headers=headers, json={
                 "inputs": input_text,
-                "parameters": {"max_new_tokens": 250, "return_full_text": False}
+                # Stop before the model starts writing the next user turn itself
+                "parameters": {"max_new_tokens": 250, "return_full_text": False, "stop": ["\nUser:"]}
             })
             
             if response.status_code == 200:
@@ -734,6 +1231,51 @@ async def chat_endpoint(request: ChatRequest):
     raise HTTPException(status_code=503, detail="No Chat API configured")
 
 
+def create_app():
+    """App factory: routes and middleware only, so it is cheap and safe to call before a fork.
+
+    Clients, indexes and job workers are built per process by the lifespan hook.
+    """
+    app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
+
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
+    # Compress sizable JSON payloads; images and event streams pass through untouched
+    if BrotliMiddleware:
+        app.add_middleware(
+            BrotliMiddleware,
+            minimum_size=COMPRESS_MIN_BYTES,
+            gzip_fallback=True,
+            excluded_handlers=[r"/api/images/.*", r"/static/.*", r"/api/jobs/.*/events"]
+        )
+    else:
+        app.add_middleware(
+            GZipMiddleware,
+            minimum_size=COMPRESS_MIN_BYTES,
+            exclude_content_types=("text/event-stream", "image/png", "image/jpeg", "image/webp")
+        )
+
+    # Ensure static directory exists
+    os.makedirs("static/generated_logos", exist_ok=True)
+    app.mount("/static", StaticFiles(directory="static"), name="static")
+    app.include_router(router)
+    return app
+
+
+app = create_app()
+
+
 if __name__ == "__main__":
     port = int(os.getenv("PORT", 8000))
-    uvicorn.run(app, host="0.0.0.0", port=port)
+    workers = int(os.getenv("WEB_CONCURRENCY", 1))
+    if workers > 1:
+        # Each worker process calls the factory itself and builds its own state in the lifespan hook
+        uvicorn.run("main:create_app", factory=True, host="0.0.0.0", port=port, workers=workers)
+    else:
+        uvicorn.run(app, host="0.0.0.0", port=port)
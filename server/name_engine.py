@@ -0,0 +1,198 @@
+import bisect
+import math
+import os
+import random
+import re
+from collections import Counter, defaultdict
+
+CORPUS_PATH = os.path.join(os.path.dirname(__file__), "data", "name_corpus.txt")
+
+VOWELS = set("aeiouy")
+
+PREFIXES = ["neo", "omni", "evo", "lum", "nova", "true", "bright", "pure", "ever", "vita", "aero", "zen"]
+SUFFIXES = ["ly", "ify", "io", "ora", "ara", "ix", "va", "ra", "eo", "ex", "um", "ia", "era", "ent", "ist", "ium",
+            "hub", "lab", "wise", "craft", "nest", "works", "co", "labs"]
+
+# Consonant pairs that read badly at the start of a name, and clusters that end one cleanly
+BAD_ONSETS = {"ng", "nk", "rt", "lk", "ts", "tz", "mb", "nd", "rk", "lp", "mp", "ck", "xz", "dn", "tn", "pn"}
+GOOD_CODAS = {"st", "nt", "rk", "ft", "nd", "ck", "sh", "th", "ng", "rn", "rd", "lt", "ld", "ll", "ss"}
+
+STOPWORDS = {"a", "an", "and", "the", "for", "of", "to", "in", "on", "with", "by", "our", "we", "who",
+             "brand", "company", "business", "industry", "people", "services", "solutions"}
+
+
+def brief_words(brief):
+    words = []
+    for field in ("keywords", "values", "industry", "audience"):
+        for word in re.findall(r"[a-z]+", (brief.get(field) or "").lower()):
+            if len(word) > 2 and word not in STOPWORDS and word not in words:
+                words.append(word)
+    return words
+
+
+def stems(word):
+    """Pronounceable fragments of a word, e.g. 'sustainable' -> ['sustain', 'sust', 'sus']."""
+    word = re.sub(r"(ability|able|ible|ation|ment|ness|ing|ity|ive|ous|ful|less|ers|er|ly|al|s)$", "", word) or word
+    out = [word] if 3 <= len(word) <= 7 else []
+    # Cut after the first vowel group + following consonant(s): "sus", "sust"
+    match = re.match(r"[^aeiouy]*[aeiouy]+[^aeiouy]{1,2}", word)
+    if match:
+        out.append(match.group(0))
+        if len(match.group(0)) > 3:
+            out.append(match.group(0)[:-1])
+    if len(word) > 7:
+        out.append(word[:5])
+    return [s for s in dict.fromkeys(out) if len(s) >= 3]
+
+
+class NameEngine:
+    """In-process brand-name generator: morpheme combination + char Markov model + phonotactic ranking."""
+
+    def __init__(self, corpus_path=CORPUS_PATH, order=3, seed=None):
+        self.order = order
+        self.rng = random.Random(seed)
+        with open(corpus_path, encoding="utf-8") as f:
+            self.corpus = [line.strip().lower() for line in f if line.strip() and not line.startswith("#")]
+        self.corpus_set = set(self.corpus)
+        self._train()
+
+    def _train(self):
+        counts = defaultdict(Counter)
+        bigrams = Counter()
+        for name in self.corpus:
+            padded = "^" * self.order + name + "$"
+            for i in range(self.order, len(padded)):
+                # Back off to shorter contexts so unseen seeds can still continue
+                for k in range(1, self.order + 1):
+                    counts[padded[i - k:i]][padded[i]] += 1
+            for i in range(len(name) - 1):
+                bigrams[name[i:i + 2]] += 1
+
+        self.model = {}
+        self.log_probs = {}
+        for context, nexts in counts.items():
+            chars = list(nexts)
+            total = sum(nexts.values())
+            cumulative, running = [], 0
+            for ch in chars:
+                running += nexts[ch]
+                cumulative.append(running)
+            self.model[context] = (chars, cumulative, total)
+            # Add-one smoothing over a-z plus the end marker
+            self.log_probs[context] = {ch: math.log((n + 1) / (total + 27)) for ch, n in nexts.items()}
+            self.log_probs[context][None] = math.log(1 / (total + 27))
+        self.bigrams = set(bigrams)
+
+    def _next_char(self, history, order=None):
+        for k in range(order or self.order, 0, -1):
+            entry = self.model.get(history[-k:])
+            if entry:
+                chars, cumulative, total = entry
+                return chars[bisect.bisect_right(cumulative, self.rng.random() * total)]
+        return "$"
+
+    def markov(self, seed="", max_len=10, order=None):
+        history = "^" * self.order + seed
+        name = seed
+        while len(name) < max_len:
+            ch = self._next_char(history, order)
+            if ch == "$":
+                break
+            name += ch
+            history += ch
+        return name
+
+    def log_likelihood(self, name):
+        padded = "^" * self.order + name + "$"
+        total = 0.0
+        for i in range(self.order, len(padded)):
+            table = self.log_probs.get(padded[i - self.order:i]) or self.log_probs.get(padded[i - 1:i])
+            if not table:
+                total += math.log(1 / 27)
+                continue
+            total += table.get(padded[i], table[None])
+        return total / (len(name) + 1)
+
+    def phonotactic_score(self, name):
+        if not 4 <= len(name) <= 11 or not name.isalpha():
+            return -10.0
+        score = 0.0
+        vowel_ratio = sum(ch in VOWELS for ch in name) / len(name)
+        score -= abs(vowel_ratio - 0.42) * 4
+        score -= abs(len(name) - 6.5) * 0.25
+
+        run, last_vowel = 0, None
+        for ch in name:
+            is_vowel = ch in VOWELS
+            run = run + 1 if is_vowel == last_vowel else 1
+            last_vowel = is_vowel
+            if run >= 3:
+                score -= 1.5
+        if name[:2] in BAD_ONSETS:
+            score -= 2.0
+        if name[-1] not in VOWELS and name[-2] not in VOWELS and name[-2:] not in GOOD_CODAS:
+            score -= 2.0
+        # Transitions never seen in the corpus are usually hard to say
+        unseen = sum(name[i:i + 2] not in self.bigrams for i in range(len(name) - 1))
+        score -= unseen * 0.6
+        if re.search(r"(.)\1\1", name):
+            score -= 3.0
+        return score
+
+    def candidates(self, brief, pool=3000, variety=0):
+        """Candidate names and the brief fragments they were built from.
+
+        variety > 0 widens the space for repeat briefs: more seeded samples, drawn from a
+        shorter Markov context, which invents far more names than the full-order model.
+        """
+        order = self.order if variety == 0 else max(1, self.order - 1)
+        words = brief_words(brief)
+        fragments = [s for w in words for s in stems(w)]
+        out = set()
+
+        for stem in fragments:
+            for suffix in SUFFIXES:
+                # Drop a trailing vowel before a vowel-initial suffix: "nova" + "ara" -> "novara"
+                joined = stem[:-1] + suffix if stem[-1] in VOWELS and suffix[0] in VOWELS else stem + suffix
+                out.add(joined)
+            if len(stem) >= 4:
+                for prefix in PREFIXES:
+                    out.add(prefix + stem)
+        for a in fragments:
+            for b in fragments:
+                if a != b:
+                    out.add(a + b[len(b) // 2:])  # portmanteau
+        for stem in fragments:
+            for _ in range(20 * (1 + variety)):
+                out.add(self.markov(seed=stem[:3], order=order))
+
+        # The Markov space of a small corpus saturates, so cap attempts rather than loop forever
+        for _ in range(pool * 2):
+            if len(out) >= pool:
+                break
+            out.add(self.markov(order=order))
+        return out, fragments
+
+    def score(self, name, fragments):
+        score = self.phonotactic_score(name) + self.log_likelihood(name) * 1.5
+        if any(f in name for f in fragments):
+            score += 1.0  # tied to the brief
+        if name in self.corpus_set:
+            score -= 5.0  # don't hand out the training data
+        return score
+
+    def generate(self, brief, count=30, pool=3000, exclude=(), variety=0):
+        """Top-ranked names for the brief, skipping any (lowercase) name in exclude."""
+        names, fragments = self.candidates(brief, pool + len(exclude), variety)
+        ranked = sorted((n for n in names if n not in exclude), key=lambda n: self.score(n, fragments), reverse=True)
+
+        # Keep the list varied: at most two names per leading trigram
+        picked, openings = [], Counter()
+        for name in ranked:
+            if openings[name[:3]] >= 2:
+                continue
+            openings[name[:3]] += 1
+            picked.append(name.capitalize())
+            if len(picked) == count:
+                break
+        return picked
@@ -0,0 +1,326 @@
+import hashlib
+import json
+import math
+import os
+import re
+import sqlite3
+import struct
+import threading
+import unicodedata
+
+LEET = str.maketrans({"0": "o", "1": "i", "3": "e", "4": "a", "5": "s", "7": "t", "$": "s", "@": "a"})
+
+
+def normalize(name):
+    """Canonical form for collision checks: 'Mílléra Co.' and 'Milera co' both become 'mileraco'."""
+    text = unicodedata.normalize("NFKD", name or "").encode("ascii", "ignore").decode("ascii")
+    text = text.lower().translate(LEET)
+    text = re.sub(r"[^a-z0-9]", "", text)
+    return re.sub(r"(.)\1+", r"\1", text)
+
+
+def variants(norm):
+    """The form itself plus every single-character deletion (SymSpell neighbourhood)."""
+    out = {norm}
+    for i in range(len(norm)):
+        out.add(norm[:i] + norm[i + 1:])
+    return out
+
+
+def edit_distance(a, b, limit=1):
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        previous = current
+    return previous[-1]
+
+
+class BloomFilter:
+    def __init__(self, capacity, error_rate=0.01):
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item):
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, item):
+        for pos in self._positions(item):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, item):
+        bits = self.bits
+        return all(bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+
+class NameIndex:
+    """Registry of every brand name issued, for exact, prefix and near-collision checks.
+
+    SQLite holds the sorted on-disk tables (normalized names and their deletion
+    variants); an in-memory Bloom filter over both answers the common "never seen"
+    case without touching disk. The filter is snapshotted to a file so a restart
+    only replays names added since the snapshot.
+    """
+
+    HEADER = struct.Struct("<QQQ")  # size, hashes, last indexed row
+
+    def __init__(self, db_path, bloom_path, capacity=500000, max_distance=1):
+        self.db_path = db_path
+        self.bloom_path = bloom_path
+        self.capacity = capacity
+        self.max_distance = max_distance
+        self.last_row = 0
+        self._lock = threading.Lock()
+        # Each name contributes its exact form plus ~len(name) deletion variants
+        self.bloom = BloomFilter(capacity * 10)
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=10)
+
+    def load(self):
+        """Restores the Bloom snapshot (if compatible) and replays rows added after it."""
+        if os.path.exists(self.bloom_path):
+            with open(self.bloom_path, "rb") as f:
+                header = f.read(self.HEADER.size)
+                bits = f.read()
+            if len(header) == self.HEADER.size:
+                size, hashes, last_row = self.HEADER.unpack(header)
+                # A truncated or differently sized snapshot is ignored and rebuilt from the table
+                if size == self.bloom.size and hashes == self.bloom.hashes and len(bits) == len(self.bloom.bits):
+                    self.bloom.bits = bytearray(bits)
+                    self.last_row = last_row
+        self.sync()
+
+    def save(self):
+        with self._lock:
+            # Per-process temp file: every worker snapshots on shutdown, possibly at the same time
+            tmp_path = f"{self.bloom_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(self.HEADER.pack(self.bloom.size, self.bloom.hashes, self.last_row))
+                f.write(self.bloom.bits)
+            os.replace(tmp_path, self.bloom_path)
+
+    def sync(self, conn=None):
+        # Picks up names registered by this or any other worker process since the last sync
+        own = conn is None
+        conn = conn or self._connect()
+        try:
+            rows = conn.execute("SELECT id, norm FROM name_index WHERE id > ? ORDER BY id", (self.last_row,)).fetchall()
+        finally:
+            if own:
+                conn.close()
+        with self._lock:
+            for row_id, norm in rows:
+                self._add_to_bloom(norm)
+                self.last_row = max(self.last_row, row_id)
+        return len(rows)
+
+    def _add_to_bloom(self, norm):
+        self.bloom.add("n:" + norm)
+        for variant in variants(norm):
+            self.bloom.add("v:" + variant)
+
+    def backfill_projects(self, batch_size=500):
+        """Indexes names from projects rows that predate the index, in resumable batches."""
+        total = 0
+        while True:
+            conn = self._connect()
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                row = conn.execute("SELECT value FROM name_index_meta WHERE key = 'last_project_id'").fetchone()
+                last_project = int(row[0]) if row else 0
+                projects = conn.execute(
+                    "SELECT id, result FROM projects WHERE id > ? ORDER BY id LIMIT ?", (last_project, batch_size)
+                ).fetchall()
+                for project_id, raw_result in projects:
+                    try:
+                        names = json.loads(raw_result).get("names") or []
+                    except (TypeError, ValueError):
+                        names = []
+                    self._insert(conn, names, project_id)
+                    last_project = project_id
+                conn.execute(
+                    "INSERT OR REPLACE INTO name_index_meta (key, value) VALUES ('last_project_id', ?)", (last_project,)
+                )
+                conn.commit()
+            finally:
+                conn.close()
+            total += len(projects)
+            if len(projects) < batch_size:
+                break
+        self.sync()
+        return total
+
+    def _insert(self, conn, names, project_id, check_near=False):
+        """Inserts names, returning the ones that were already taken (exactly, or within max_distance)."""
+        taken = []
+        for name in names:
+            norm = normalize(name)
+            if not norm:
+                continue
+            if check_near and self.neighbours(name, conn):
+                taken.append(name)
+                continue
+            # The UNIQUE index on norm settles exact duplicates, including ones from other processes
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO name_index (norm, name, project_id) VALUES (?, ?, ?)", (norm, name, project_id)
+            )
+            if not cursor.rowcount:
+                taken.append(name)
+                continue
+            conn.executemany(
+                "INSERT INTO name_deletes (variant, name_id) VALUES (?, ?)",
+                [(variant, cursor.lastrowid) for variant in variants(norm)]
+            )
+            if check_near:
+                # Later names in the same batch must see this one; a rollback only leaves a false positive
+                with self._lock:
+                    self._add_to_bloom(norm)
+        return taken
+
+    def register(self, names, project_id):
+        """Claims names for project_id; returns the ones another request claimed first.
+
+        Check and insert share one write transaction, so two requests (in any worker
+        process) racing for the same name cannot both get it.
+        """
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            # Holding the write lock, catch up on everything committed so far before checking
+            self.sync(conn)
+            taken = self._insert(conn, names, project_id, check_near=True)
+            # Names registered live must not be replayed by the projects backfill
+            conn.execute(
+                "UPDATE name_index_meta SET value = MAX(CAST(value AS INTEGER), ?) WHERE key = 'last_project_id'",
+                (project_id,)
+            )
+            conn.commit()
+        finally:
+            conn.close()
+        self.sync()
+        return taken
+
+    def issue(self, names, draw, project_id, count=30, rounds=4):
+        """Registers names for project_id, re-drawing any that lose a race until count are claimed.
+
+        draw is the same callback top_up takes. Returns the names actually issued.
+        """
+        issued, pending = [], list(names)
+        for _ in range(rounds):
+            taken = set(self.register(pending, project_id))
+            issued.extend(name for name in pending if name not in taken)
+            if not taken or len(issued) >= count:
+                break
+            pending = self.top_up([], draw, count - len(issued))
+        return issued
+
+    def might_collide(self, name):
+        """Bloom-only check: False means definitely unused and not within one edit of a used name."""
+        norm = normalize(name)
+        if "n:" + norm in self.bloom:
+            return True
+        return any("v:" + variant in self.bloom for variant in variants(norm))
+
+    def exact(self, name, conn=None):
+        norm = normalize(name)
+        if "n:" + norm not in self.bloom:
+            return None
+        own = conn is None
+        conn = conn or self._connect()
+        try:
+            row = conn.execute(
+                "SELECT name, project_id FROM name_index WHERE norm = ? LIMIT 1", (norm,)
+            ).fetchone()
+        finally:
+            if own:
+                conn.close()
+        return {"name": row[0], "projectId": row[1]} if row else None
+
+    def prefix(self, text, limit=20):
+        norm = normalize(text)
+        conn = self._connect()
+        try:
+            # Range scan on the sorted norm index
+            rows = conn.execute(
+                "SELECT name, project_id FROM name_index WHERE norm >= ? AND norm < ? ORDER BY norm LIMIT ?",
+                (norm, norm + "\x7f", limit)
+            ).fetchall()
+        finally:
+            conn.close()
+        return [{"name": name, "projectId": project_id} for name, project_id in rows]
+
+    def neighbours(self, name, conn=None):
+        norm = normalize(name)
+        candidates = [v for v in variants(norm) if "v:" + v in self.bloom]
+        if not candidates:
+            return []
+        own = conn is None
+        conn = conn or self._connect()
+        try:
+            rows = conn.execute(
+                f"SELECT DISTINCT n.norm, n.name, n.project_id FROM name_deletes d JOIN name_index n ON n.id = d.name_id "
+                f"WHERE d.variant IN ({','.join('?' * len(candidates))})",
+                candidates
+            ).fetchall()
+        finally:
+            if own:
+                conn.close()
+        return [
+            {"name": existing, "projectId": project_id}
+            for other, existing, project_id in rows
+            if edit_distance(norm, other, self.max_distance) <= self.max_distance
+        ]
+
+    def top_up(self, names, draw, count=30, rounds=8):
+        """Fresh names up to count: filters names, then keeps drawing new candidates until enough pass.
+
+        draw(round, exclude) returns a batch of candidates; exclude holds the lowercase
+        names already tried, so repeated briefs keep getting new names rather than the
+        same top-ranked (and by now issued) list.
+        """
+        fresh = self.filter_new(names)[:count]
+        tried = {name.lower() for name in names}
+        picked = {normalize(name) for name in fresh}
+        for round_number in range(rounds):
+            if len(fresh) >= count:
+                break
+            batch = [name for name in draw(round_number, tried) if name.lower() not in tried]
+            if not batch:
+                continue
+            tried.update(name.lower() for name in batch)
+            for name in self.filter_new(batch):
+                if normalize(name) not in picked:
+                    picked.add(normalize(name))
+                    fresh.append(name)
+                    if len(fresh) == count:
+                        break
+        return fresh
+
+    def filter_new(self, names):
+        """Drops names that were already issued, or are within max_distance edits of one."""
+        self.sync()
+        fresh, seen = [], set()
+        conn = None
+        try:
+            for name in names:
+                norm = normalize(name)
+                if not norm or norm in seen:
+                    continue
+                if self.might_collide(name):
+                    conn = conn or self._connect()
+                    if self.exact(name, conn) or self.neighbours(name, conn):
+                        continue
+                seen.add(norm)
+                fresh.append(name)
+        finally:
+            if conn:
+                conn.close()
+        return fresh
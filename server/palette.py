@@ -0,0 +1,207 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from PIL import Image
+
+NAMED_COLORS_PATH = os.path.join(os.path.dirname(__file__), "data", "named_colors.txt")
+
+
+def srgb_to_lab(rgb):
+    """Vectorized sRGB (0-255, shape (..., 3)) to CIELAB under D65."""
+    c = np.asarray(rgb, dtype=np.float64) / 255.0
+    c = np.where(c > 0.04045, ((c + 0.055) / 1.055) ** 2.4, c / 12.92)
+    xyz = c @ np.array([
+        [0.4124, 0.2126, 0.0193],
+        [0.3576, 0.7152, 0.1192],
+        [0.1805, 0.0722, 0.9505],
+    ])
+    xyz /= np.array([0.95047, 1.0, 1.08883])
+    f = np.where(xyz > 0.008856, np.cbrt(xyz), 7.787 * xyz + 16 / 116)
+    return np.stack([116 * f[..., 1] - 16, 500 * (f[..., 0] - f[..., 1]), 200 * (f[..., 1] - f[..., 2])], axis=-1)
+
+
+class KDTree:
+    """Minimal 3-d KD-tree for nearest-neighbour lookups over a fixed point set."""
+
+    def __init__(self, points):
+        self.points = np.asarray(points, dtype=np.float64)
+        self.root = self._build(np.arange(len(self.points)), 0)
+
+    def _build(self, indices, depth):
+        if len(indices) == 0:
+            return None
+        axis = depth % self.points.shape[1]
+        indices = indices[np.argsort(self.points[indices, axis])]
+        mid = len(indices) // 2
+        return (indices[mid], axis, self._build(indices[:mid], depth + 1), self._build(indices[mid + 1:], depth + 1))
+
+    def nearest(self, point):
+        point = np.asarray(point, dtype=np.float64)
+        best = [None, np.inf]
+
+        def visit(node):
+            if node is None:
+                return
+            index, axis, left, right = node
+            dist = float(np.sum((self.points[index] - point) ** 2))
+            if dist < best[1]:
+                best[0], best[1] = index, dist
+            diff = point[axis] - self.points[index, axis]
+            near, far = (left, right) if diff < 0 else (right, left)
+            visit(near)
+            if diff * diff < best[1]:
+                visit(far)
+
+        visit(self.root)
+        return best[0]
+
+
+def _load_named_colors(path=NAMED_COLORS_PATH):
+    names, rgb = [], []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("# "):
+                continue
+            hex_code, name = line.split(" ", 1)
+            names.append(name)
+            rgb.append([int(hex_code[i:i + 2], 16) for i in (1, 3, 5)])
+    return names, KDTree(srgb_to_lab(np.array(rgb)))
+
+
+COLOR_NAMES, COLOR_TREE = _load_named_colors()
+
+
+def nearest_color_name(rgb):
+    return COLOR_NAMES[COLOR_TREE.nearest(srgb_to_lab(rgb))]
+
+
+def kmeans(points, k, iterations=12, seed=0):
+    """Vectorized k-means with k-means++ seeding; returns (centers, labels)."""
+    rng = np.random.default_rng(seed)
+    centers = [points[rng.integers(len(points))]]
+    for _ in range(1, k):
+        dist = np.min(((points[:, None, :] - np.array(centers)[None]) ** 2).sum(-1), axis=1)
+        if dist.sum() == 0:
+            break
+        centers.append(points[rng.choice(len(points), p=dist / dist.sum())])
+    centers = np.array(centers)
+
+    for _ in range(iterations):
+        labels = np.argmin(((points[:, None, :] - centers[None]) ** 2).sum(-1), axis=1)
+        updated = np.array([
+            points[labels == i].mean(axis=0) if np.any(labels == i) else centers[i] for i in range(len(centers))
+        ])
+        if np.allclose(updated, centers):
+            break
+        centers = updated
+    labels = np.argmin(((points[:, None, :] - centers[None]) ** 2).sum(-1), axis=1)
+    return centers, labels
+
+
+def background_mask(lab, step_delta=3.0, chroma_limit=8.0):
+    """Boolean (H, W) mask of background pixels in an (H, W, 3) Lab image.
+
+    Flood-fills from the border through neighbours that differ by less than step_delta,
+    so smooth gradients and vignettes are followed, then also drops near-gray pixels in
+    the border's lightness range that the fill could not reach.
+    """
+    height, width = lab.shape[:2]
+    mask = np.zeros((height, width), dtype=bool)
+    mask[0], mask[-1], mask[:, 0], mask[:, -1] = True, True, True, True
+    # Differences to the right/down neighbour, reused for both directions of each edge
+    horizontal = np.linalg.norm(lab[:, 1:] - lab[:, :-1], axis=-1) < step_delta
+    vertical = np.linalg.norm(lab[1:] - lab[:-1], axis=-1) < step_delta
+    while True:
+        grown = mask.copy()
+        grown[:, 1:] |= mask[:, :-1] & horizontal
+        grown[:, :-1] |= mask[:, 1:] & horizontal
+        grown[1:] |= mask[:-1] & vertical
+        grown[:-1] |= mask[1:] & vertical
+        if (grown == mask).all():
+            break
+        mask = grown
+
+    border = np.concatenate([lab[0], lab[-1], lab[:, 0], lab[:, -1]])
+    low, high = np.percentile(border[:, 0], [2, 98])
+    chroma = np.hypot(lab[..., 1], lab[..., 2])
+    # Enclosed highlights of a vignette run brighter than any border pixel
+    mask |= (chroma < chroma_limit) & (lab[..., 0] >= low - 2) & (lab[..., 0] <= high + 10)
+    return mask
+
+
+def extract_palette(path, count=3, clusters=6, size=96):
+    """Dominant logo colors as [{"hex", "name"}], most prominent first, with the background removed."""
+    image = Image.open(path).convert("RGBA")
+    image.thumbnail((size, size))
+    rgba = np.asarray(image, dtype=np.float64)
+    opaque = rgba[..., 3] >= 128
+    if not opaque.any():
+        return []
+
+    grid = srgb_to_lab(rgba[..., :3])
+    foreground = opaque & ~background_mask(grid)
+    if foreground.sum() < 16:
+        foreground = opaque
+    lab, pixels = grid[foreground], rgba[..., :3][foreground]
+
+    centers, labels = kmeans(lab, min(clusters, len(lab)))
+    sizes = np.bincount(labels, minlength=len(centers))
+    # Anti-aliased edges split one dark mark into several gray clusters, so weight
+    # clusters by chroma as well as size to keep a smaller brand hue in the palette
+    prominence = sizes * (1 + np.hypot(centers[:, 1], centers[:, 2]) / 20)
+
+    palette = []
+    for i in np.argsort(-prominence):
+        if sizes[i] == 0:
+            continue
+        # Skip clusters that are perceptually the same as one already picked
+        if any(np.linalg.norm(centers[i] - centers[j]) < 10 for j, _ in palette):
+            continue
+        rgb = pixels[labels == i].mean(axis=0)
+        palette.append((i, rgb))
+        if len(palette) == count:
+            break
+
+    return [
+        {"hex": "#{:02X}{:02X}{:02X}".format(*np.clip(np.round(rgb), 0, 255).astype(int)), "name": nearest_color_name(rgb)}
+        for _, rgb in palette
+    ]
+
+
+def has_brand_color(palette, min_chroma=15.0):
+    """True when at least one swatch is clearly chromatic rather than a white/gray/black."""
+    if not palette:
+        return False
+    rgb = np.array([[int(c["hex"][i:i + 2], 16) for i in (1, 3, 5)] for c in palette])
+    lab = srgb_to_lab(rgb)
+    return bool((np.hypot(lab[:, 1], lab[:, 2]) >= min_chroma).any())
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    # Called from request threads and job workers, so creation is locked to build exactly one pool.
+    # Spawned children start clean instead of forking a process that holds threads and sockets.
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ProcessPoolExecutor(
+                    max_workers=int(os.getenv("PALETTE_WORKERS", 2)),
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+    return _pool
+
+
+def shutdown_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
@@ -0,0 +1,56 @@
+import hashlib
+import json
+import sqlite3
+import time
+
+
+class SharedCache:
+    """TTL key/value cache in SQLite, visible to every worker process on the host."""
+
+    def __init__(self, db_path, ttl=300):
+        self.db_path = db_path
+        self.ttl = ttl
+        self._next_purge = 0.0
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=10)
+
+    @staticmethod
+    def make_key(*parts):
+        return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT value FROM shared_cache WHERE key = ? AND expires_at > ?", (key, time.time())
+            ).fetchone()
+        finally:
+            conn.close()
+        return json.loads(row[0]) if row else None
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.time() + (ttl if ttl is not None else self.ttl)
+        conn = self._connect()
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO shared_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value), expires_at)
+            )
+            # Expired rows are otherwise only read past, so sweep them at most once per TTL
+            now = time.time()
+            if now >= self._next_purge:
+                conn.execute("DELETE FROM shared_cache WHERE expires_at <= ?", (now,))
+                self._next_purge = now + self.ttl
+            conn.commit()
+        finally:
+            conn.close()
+
+    def purge(self):
+        conn = self._connect()
+        try:
+            removed = conn.execute("DELETE FROM shared_cache WHERE expires_at <= ?", (time.time(),)).rowcount
+            conn.commit()
+        finally:
+            conn.close()
+        return removed
@@ -0,0 +1,56 @@
+import asyncio
+import inspect
+
+
+def normalize_input(model):
+    # Casing and whitespace differences should not defeat deduplication
+    data = model.dict() if hasattr(model, "dict") else dict(model)
+    normalized = []
+    for key in sorted(data):
+        value = data[key]
+        if isinstance(value, str):
+            value = " ".join(value.lower().split())
+        normalized.append((key, value))
+    return tuple(normalized)
+
+
+class SingleFlight:
+    """Collapses concurrent identical calls onto one shared upstream task."""
+
+    def __init__(self):
+        self._calls = {}  # key -> [task, waiter_count]
+
+    def in_flight(self):
+        return len(self._calls)
+
+    async def do(self, key, fn, *args):
+        call = self._calls.get(key)
+        if call is None:
+            if inspect.iscoroutinefunction(fn):
+                task = asyncio.ensure_future(fn(*args))
+            else:
+                # Blocking stages run in a thread so duplicates can actually overlap
+                task = asyncio.ensure_future(asyncio.to_thread(fn, *args))
+            call = [task, 0]
+            self._calls[key] = call
+            task.add_done_callback(lambda t, k=key: self._forget(k, t))
+        else:
+            print(f"Coalescing duplicate in-flight request: {key[0]}")
+
+        call[1] += 1
+        try:
+            # Shield so one disconnecting waiter does not cancel the shared call
+            return await asyncio.shield(call[0])
+        except asyncio.CancelledError:
+            # Last waiter gone: nobody needs the upstream result any more
+            if call[1] == 1 and not call[0].done():
+                call[0].cancel()
+                self._forget(key, call[0])
+            raise
+        finally:
+            call[1] -= 1
+
+    def _forget(self, key, task):
+        call = self._calls.get(key)
+        if call is not None and call[0] is task:
+            del self._calls[key]
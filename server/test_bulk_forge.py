@@ -0,0 +1,36 @@
+import requests
+import json
+import time
+
+def test_bulk_forge():
+    url = "http://localhost:8000/api/forge/bulk?type=description&tone=Friendly"
+    catalog = "productName,productDescription\n" + "\n".join([
+        "EcoBottle,Sustainable water bottle",
+        "TrailMug,Insulated camping mug",
+        "LeafBag,Compostable grocery bag",
+    ]) + "\n"
+
+    print(f"Testing {url}...")
+    try:
+        response = requests.post(url, data=catalog.encode("utf-8"), headers={"Content-Type": "text/csv"})
+        print(f"Status Code: {response.status_code}")
+        run = response.json()
+        print("Run:", json.dumps(run, indent=2))
+
+        status_url = f"http://localhost:8000{run['statusUrl']}"
+        while True:
+            progress = requests.get(status_url).json()
+            print(f"Progress: {progress['done']} done, {progress['failed']} failed ({progress['status']})")
+            if progress["status"] in ("done", "failed"):
+                break
+            time.sleep(2)
+
+        results = requests.get(f"http://localhost:8000{run['resultsUrl']}")
+        for line in results.text.splitlines():
+            print(json.dumps(json.loads(line), indent=2))
+
+    except Exception as e:
+        print(f"Connection Failed: {e}")
+
+if __name__ == "__main__":
+    test_bulk_forge()
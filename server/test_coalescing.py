@@ -0,0 +1,32 @@
+import requests
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+def test_coalescing():
+    url = "http://localhost:8000/api/generate/tone"
+    payload = {
+        "industry": "Coffee",
+        "audience": "Millennials",
+        "values": "Sustainability",
+        "keywords": "Eco, Fresh",
+        "tone": "Friendly"
+    }
+
+    print(f"Testing {url} with 5 identical concurrent requests...")
+    try:
+        start = time.time()
+        with ThreadPoolExecutor(max_workers=5) as pool:
+            responses = list(pool.map(lambda _: requests.post(url, json=payload), range(5)))
+        print(f"Completed in {time.time() - start:.2f}s")
+
+        bodies = [r.json() for r in responses]
+        print("Status Codes:", [r.status_code for r in responses])
+        print("Identical Responses:", all(b == bodies[0] for b in bodies))
+        print("Response Body:", json.dumps(bodies[0], indent=2))
+
+    except Exception as e:
+        print(f"Connection Failed: {e}")
+
+if __name__ == "__main__":
+    test_coalescing()
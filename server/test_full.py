@@ -1,6 +1,11 @@
 import asyncio
 import os
-from main import orchestrator, BrandInput, ContentForgeInput
+import main
+from main import BrandInput, ContentForgeInput
+
+# Importing main only builds the app; the orchestrator is created per process
+main.init_services()
+orchestrator = main.orchestrator
 
 async def test_all():
     print("=== Testing All AI Modules ===")
@@ -29,7 +34,7 @@ async def test_all():
     # 2. Creative Generation (Groq/Mistral)
     print("\n[2] Testing Creative Generation (Groq/Mistral)...")
     try:
-        creative = await orchestrator.generate_creative(mock_input)
+        creative = orchestrator.generate_creative(mock_input)
         if "names" in creative:
             print("  ✅ Success! Generated names:", creative["names"][:3])
         else:
@@ -62,7 +67,7 @@ async def test_all():
     # 5. Tone Analysis (HF)
     print("\n[5] Testing Tone Analysis (HF)...")
     try:
-        tone = await orchestrator.analyze_tone(mock_input)
+        tone = orchestrator.analyze_tone(mock_input)
         if tone.get("sentiment"):
              print(f"  ✅ Success! Sentiment: {tone['sentiment']} ({tone.get('confidence')})")
         else:
@@ -0,0 +1,36 @@
+import requests
+import json
+
+def test_visuals_job():
+    url = "http://localhost:8000/api/generate/visuals"
+    payload = {
+        "industry": "Coffee",
+        "audience": "Millennials",
+        "values": "Sustainability",
+        "keywords": "Eco, Fresh",
+        "tone": "Friendly"
+    }
+
+    print(f"Testing {url}...")
+    try:
+        response = requests.post(url, json=payload)
+        print(f"Status Code: {response.status_code}")
+        job = response.json()
+        print("Job:", json.dumps(job, indent=2))
+
+        # Block on the SSE stream until the job completes
+        events_url = f"http://localhost:8000{job['eventsUrl']}"
+        print(f"Listening on {events_url}...")
+        with requests.get(events_url, stream=True) as stream:
+            for line in stream.iter_lines(decode_unicode=True):
+                if line:
+                    print(line)
+
+        final = requests.get(f"http://localhost:8000{job['statusUrl']}").json()
+        print("Final Job:", json.dumps(final, indent=2))
+
+    except Exception as e:
+        print(f"Connection Failed: {e}")
+
+if __name__ == "__main__":
+    test_visuals_job()
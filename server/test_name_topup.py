@@ -0,0 +1,88 @@
+import os
+import sqlite3
+import tempfile
+import threading
+
+from name_engine import NameEngine
+from name_index import NameIndex
+
+BRIEF = {
+    "industry": "Coffee",
+    "audience": "Millennials",
+    "values": "Sustainability",
+    "keywords": "Eco, Fresh",
+    "tone": "Friendly"
+}
+
+def make_db():
+    workdir = tempfile.mkdtemp()
+    db_path = os.path.join(workdir, "names.db")
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("CREATE TABLE projects (id INTEGER PRIMARY KEY AUTOINCREMENT, input TEXT, result TEXT)")
+    conn.execute("CREATE TABLE name_index (id INTEGER PRIMARY KEY AUTOINCREMENT, norm TEXT, name TEXT, project_id INTEGER)")
+    conn.execute("CREATE UNIQUE INDEX idx_name_index_norm_unique ON name_index (norm)")
+    conn.execute("CREATE TABLE name_deletes (variant TEXT, name_id INTEGER)")
+    conn.execute("CREATE INDEX idx_name_deletes_variant ON name_deletes (variant)")
+    conn.execute("CREATE TABLE name_index_meta (key TEXT PRIMARY KEY, value TEXT)")
+    conn.commit()
+    conn.close()
+    return db_path, os.path.join(workdir, "names.bloom")
+
+def test_repeated_brief_names():
+    # The same brief submitted again and again must keep getting 30 unissued names
+    db_path, bloom_path = make_db()
+    index = NameIndex(db_path, bloom_path, capacity=10000)
+    index.load()
+    engine = NameEngine(seed=7)
+    brief = BRIEF
+
+    counts, issued = [], set()
+    for project_id in range(1, 21):
+        names = index.top_up(
+            engine.generate(brief, 30),
+            lambda round_number, tried: engine.generate(brief, 120, exclude=tried, variety=round_number + 1)
+        )
+        index.register(names, project_id)
+        counts.append(len(names))
+        issued.update(name.lower() for name in names)
+
+    print("Fresh names per project:", counts)
+    assert all(count == 30 for count in counts), counts
+    assert len(issued) == 30 * len(counts), "a name was issued twice"
+
+def test_concurrent_identical_requests():
+    # Two workers answering the same brief at the same moment both pick the same top-ranked
+    # names; the registry must hand each name to one of them and re-draw for the other
+    db_path, bloom_path = make_db()
+    engine = NameEngine(seed=7)
+    draw = lambda round_number, tried: engine.generate(BRIEF, 120, exclude=tried, variety=round_number + 1)
+    indexes = [NameIndex(db_path, bloom_path, capacity=10000) for _ in range(2)]
+    for index in indexes:
+        index.load()
+    candidates = indexes[0].top_up(engine.generate(BRIEF, 30), draw)
+
+    results = {}
+    barrier = threading.Barrier(2)
+    def request(project_id):
+        barrier.wait()
+        results[project_id] = indexes[project_id - 1].issue(candidates, draw, project_id)
+    threads = [threading.Thread(target=request, args=(project_id,)) for project_id in (1, 2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    print("Issued per request:", {pid: len(names) for pid, names in results.items()})
+    assert all(len(names) == 30 for names in results.values()), results
+    assert not {n.lower() for n in results[1]} & {n.lower() for n in results[2]}, "a name was issued twice"
+
+    conn = sqlite3.connect(db_path)
+    owners = dict(conn.execute("SELECT name, project_id FROM name_index").fetchall())
+    conn.close()
+    for project_id, names in results.items():
+        assert all(owners[name] == project_id for name in names)
+
+if __name__ == "__main__":
+    test_repeated_brief_names()
+    test_concurrent_identical_requests()
@@ -0,0 +1,121 @@
+import math
+import os
+import re
+from collections import Counter, defaultdict
+
+import numpy as np
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
+
+NEGATIONS = {"not", "no", "never", "without", "nor", "isnt", "arent", "dont", "doesnt", "wont", "cant", "lack", "lacks"}
+INTENSIFIERS = {"very": 1.5, "extremely": 1.8, "highly": 1.5, "really": 1.3, "super": 1.5, "incredibly": 1.8,
+                "truly": 1.3, "deeply": 1.4, "slightly": 0.6, "somewhat": 0.7, "barely": 0.5}
+NEGATION_SCOPE = 3
+# Lexicon hits needed before a score is reported at full confidence
+FULL_EVIDENCE_HITS = 3
+
+
+def tokenize(text):
+    return re.findall(r"[a-z]+", (text or "").lower().replace("'", ""))
+
+
+class TextAnalyzer:
+    """Lexicon sentiment scorer and RAKE/TF-IDF keyword extractor, using only bundled data files."""
+
+    def __init__(self, lexicon_path=os.path.join(DATA_DIR, "sentiment_lexicon.txt"),
+                 stopwords_path=os.path.join(DATA_DIR, "stopwords.txt")):
+        self.vocab = {}
+        weights = []
+        with open(lexicon_path, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip() or line.startswith("#"):
+                    continue
+                word, score = line.rstrip("\n").split("\t")
+                self.vocab[word] = len(weights)
+                weights.append(float(score))
+        self.weights = np.array(weights)
+
+        with open(stopwords_path, encoding="utf-8") as f:
+            self.stopwords = {line.strip() for line in f if line.strip() and not line.startswith("#")}
+
+    def sentiment_batch(self, texts):
+        """Scores every text in one vectorized pass. Returns [{"label", "compound", "confidence"}]."""
+        rows, cols, multipliers = [], [], []
+        for row, text in enumerate(texts):
+            negate_left, boost = 0, 1.0
+            for token in tokenize(text):
+                if token in NEGATIONS:
+                    negate_left = NEGATION_SCOPE
+                    continue
+                if token in INTENSIFIERS:
+                    boost = INTENSIFIERS[token]
+                    continue
+                index = self.vocab.get(token)
+                if index is not None:
+                    rows.append(row)
+                    cols.append(index)
+                    multipliers.append(boost * (-0.75 if negate_left else 1.0))
+                negate_left = max(0, negate_left - 1)
+                boost = 1.0
+
+        raw = np.bincount(
+            np.array(rows, dtype=np.int64),
+            weights=self.weights[np.array(cols, dtype=np.int64)] * np.array(multipliers),
+            minlength=len(texts)
+        ) if rows else np.zeros(len(texts))
+        # Squash the unbounded sum into [-1, 1] (same normalisation VADER uses)
+        compound = raw / np.sqrt(raw * raw + 15)
+        hits = np.bincount(np.array(rows, dtype=np.int64), minlength=len(texts))
+
+        results = []
+        for value, hit_count in zip(compound, hits):
+            if value >= 0.05:
+                label = "positive"
+            elif value <= -0.05:
+                label = "negative"
+            else:
+                label = "neutral"
+            confidence = 1 - abs(value) if label == "neutral" else 0.5 + abs(value) / 2
+            # Few or no lexicon words is weak evidence either way: pull towards a coin flip
+            confidence = 0.5 + (confidence - 0.5) * min(1.0, hit_count / FULL_EVIDENCE_HITS)
+            results.append({"label": label, "compound": round(float(value), 3), "confidence": round(float(confidence), 2)})
+        return results
+
+    def _phrases(self, text):
+        # RAKE candidates: runs of content words split at stopwords and punctuation
+        phrases = []
+        for fragment in re.split(r"[.,;:!?()\[\]\"\n/|-]+", (text or "").lower()):
+            current = []
+            for token in tokenize(fragment):
+                if token in self.stopwords or len(token) < 3:
+                    if current:
+                        phrases.append(tuple(current))
+                    current = []
+                else:
+                    current.append(token)
+            if current:
+                phrases.append(tuple(current))
+        return [p for p in phrases if len(p) <= 3]
+
+    def keywords_batch(self, texts, limit=5):
+        """RAKE phrase scores per text, re-weighted by inverse document frequency across the batch."""
+        docs = [self._phrases(text) for text in texts]
+        document_frequency = Counter(phrase for phrases in docs for phrase in set(phrases))
+        n = len(docs)
+
+        results = []
+        for phrases in docs:
+            frequency, degree = Counter(), defaultdict(int)
+            for phrase in phrases:
+                for word in phrase:
+                    frequency[word] += 1
+                    degree[word] += len(phrase) - 1
+            word_score = {w: (degree[w] + frequency[w]) / frequency[w] for w in frequency}
+
+            scored = {}
+            for phrase in phrases:
+                idf = math.log((1 + n) / (1 + document_frequency[phrase])) + 1
+                scored[phrase] = sum(word_score[w] for w in phrase) * idf
+            ranked = sorted(scored, key=lambda p: (-scored[p], phrases.index(p)))
+            results.append([" ".join(p) for p in ranked[:limit]])
+        return results